@@ -6,144 +6,25 @@
 # =======================================================================
 import sys
 import os
-sys.dont_write_bytecode = True
-import shutil
 import subprocess
 import threading
-import re
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QGridLayout, QLabel, QLineEdit, QComboBox, QPushButton, QCheckBox,
     QSpinBox, QProgressBar, QTextEdit, QListWidget, QAbstractItemView,
-    QFileDialog, QFrame, QTabWidget
+    QFileDialog, QFrame, QTabWidget, QMessageBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QObject
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QTimer
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent
 
-# --- Import der Vorschau ---
-try:
-    from video_preview import VideoPreviewDialog
-except ImportError:
-    VideoPreviewDialog = None
-
-
-# -------------------- Hilfsfunktionen & Sicherheit --------------------
-def which_bin(name):
-    return shutil.which(name) is not None
-
-def detect_gpu_short():
-    try:
-        res = subprocess.run(["lspci"], capture_output=True, text=True, check=False)
-        s = res.stdout.lower()
-        if "nvidia" in s: return "NVIDIA"
-        if "amd" in s or "ati" in s: return "AMD"
-        if "intel" in s: return "INTEL"
-    except Exception:
-        pass
-    return "CPU"
-
-def probe_duration_seconds(path: Path):
-    if not which_bin("ffprobe"): return None
-    try:
-        out = subprocess.check_output([
-            "ffprobe", "-v", "error", "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1", str(path.resolve())
-        ], stderr=subprocess.DEVNULL).decode().strip()
-        return float(out) if out else None
-    except Exception: return None
-
-def calculate_bitrate_for_target_size(filepath, target_size_mb, audio_bitrate_kbps=192):
-    dur = probe_duration_seconds(Path(filepath))
-    if not dur or dur <= 0: return None
-    total_kbps = (target_size_mb * 8192) / dur
-    video_kbps = max(total_kbps - audio_bitrate_kbps, 300)
-    return int(video_kbps)
-
-def make_unique_path(path: Path) -> Path:
-    path = path.resolve()
-    if not path.exists(): return path
-    parent, stem, suffix = path.parent, path.stem, path.suffix
-    new_stem = f"{stem}_converted"
-    candidate = parent / f"{new_stem}{suffix}"
-    if not candidate.exists(): return candidate
-    i = 1
-    while True:
-        candidate = parent / f"{new_stem}({i}){suffix}"
-        if not candidate.exists(): return candidate
-        i += 1
-
-def sanitize_time_str(time_str: str, default: str = "00:00:00") -> str:
-    time_str = time_str.strip()
-    if re.match(r"^(\d{2}:)?\d{2}:\d{2}(\.\d+)?$", time_str) or re.match(r"^\d+(\.\d+)?$", time_str):
-        return time_str
-    return default
-
-def sanitize_int(val_str: str, default: int = 0) -> int:
-    try:
-        return abs(int(re.sub(r"[^\d]", "", val_str)))
-    except ValueError:
-        return default
-
-time_re = re.compile(r"time=(\d+):(\d+):(\d+(?:\.\d+)?)")
-_encoder_cache = {}
-
-def is_encoder_available(encoder: str) -> bool:
-    if encoder in _encoder_cache: return _encoder_cache[encoder]
-    try:
-        cmd = ["ffmpeg", "-hide_banner", "-encoders"]
-        out = subprocess.check_output(cmd).decode()
-        res = encoder in out
-        _encoder_cache[encoder] = res
-        return res
-    except: return False
-
-_ENCODER_MAP = {
-    "H.264": {"NVIDIA": ["h264_nvenc"], "AMD": ["h264_vaapi"], "INTEL": ["h264_vaapi"], "CPU": ["libx264"]},
-    "H.265": {"NVIDIA": ["hevc_nvenc"], "AMD": ["hevc_vaapi"], "INTEL": ["hevc_vaapi"], "CPU": ["libx265"]},
-    "VP9":   {"NVIDIA": [], "AMD": ["vp9_vaapi"], "INTEL": ["vp9_vaapi"], "CPU": ["libvpx-vp9"]},
-    "AV1":   {"NVIDIA": ["av1_nvenc"], "AMD": ["av1_vaapi"], "INTEL": ["av1_vaapi"], "CPU": ["libsvtav1"]},
-}
-
-def _select_encoder(fmt, mode):
-    candidates = _ENCODER_MAP.get(fmt, {}).get(mode, [])
-    for enc in candidates:
-        if is_encoder_available(enc): return enc
-    return {"H.264":"libx264", "H.265":"libx265", "VP9":"libvpx-vp9", "AV1":"libsvtav1"}.get(fmt, "libx264")
-
-def _codec_quality_args(codec, qmode, qval_raw, preset, infile):
-    args = ["-c:v", codec]
-
-    if "nvenc" in codec:
-        p_map = {"ultrafast":"p1","superfast":"p2","veryfast":"p3","faster":"p4","fast":"p5","medium":"p6","slow":"p7"}
-        p = p_map.get(preset, "p4")
-    elif "libsvtav1" in codec:
-        svt_map = {
-            "ultrafast": "12", "superfast": "11", "veryfast": "10",
-            "faster": "8", "fast": "7", "medium": "6",
-            "slow": "4", "slower": "3", "veryslow": "2"
-        }
-        p = svt_map.get(preset, "6")
-    else:
-        p = preset
-
-    if "CQ" in qmode:
-        qn = str(sanitize_int(qval_raw, default=23))
-        if "nvenc" in codec: args += ["-rc", "vbr", "-cq", qn, "-preset", p]
-        elif "vaapi" in codec: args += ["-rc_mode", "CQP", "-qp", qn]
-        elif "libvpx-vp9" in codec: args += ["-crf", qn, "-b:v", "0"]
-        else: args += ["-crf", qn, "-preset", p]
-    elif "Bitrate" in qmode:
-        kbps = str(sanitize_int(qval_raw, default=5000))
-        args += ["-b:v", f"{kbps}k"]
-        if "libvpx-vp9" not in codec: args += ["-preset", p]
-    else:
-        target_mb = sanitize_int(qval_raw, default=700)
-        vkbps = calculate_bitrate_for_target_size(infile, target_mb) or 5000
-        args += ["-b:v", f"{vkbps}k"]
-        if "libvpx-vp9" not in codec: args += ["-preset", p]
-    return args
+# --- GUI-freie Engine (Argumente & Stapelverarbeitung) ---
+from video_engine import (
+    detect_gpu_short, rescan_hardware, make_settings, job_count, BatchRunner, LogBuffer, warm_up_encoders, PRESETS, AUTO_PRESETS,
+    SCRATCH_DIR, build_ffmpeg_args as engine_build_ffmpeg_args
+)
+from video_journal import Journal
 
 
 # -------------------- Drag and Drop ListWidget --------------------
@@ -174,30 +55,46 @@ class FileListWidget(QListWidget):
 
 # -------------------- Worker Signals --------------------
 class ConversionSignals(QObject):
-    log_signal = pyqtSignal(str)
     file_label_signal = pyqtSignal(str)
-    file_progress_signal = pyqtSignal(float)
+    job_label_signal = pyqtSignal(int, str)
+    job_progress_signal = pyqtSignal(int, float)
+    job_stats_signal = pyqtSignal(int, object)
+    gpu_signal = pyqtSignal(str)
+    chunk_progress_signal = pyqtSignal(int, object)
     total_progress_signal = pyqtSignal(float)
     finished_signal = pyqtSignal()
 
 
 # -------------------- Hauptfenster --------------------
 class VideoConverterWindow(QMainWindow):
+    # Maximale Zeilenzahl der Log-Ansicht (vollständige Logs liegen je Job auf der Platte)
+    LOG_MAX_LINES = 5000
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("GuideOS Videokonverter")
         self.resize(800, 380)
 
         self.selected_files = []
-        self.current_proc = None
-        self.stop_event = threading.Event()
+        self.runner = None
+        self.journal = Journal()
+
+        # ffmpeg-Ausgabe sammelt sich im Ringpuffer und wird höchstens alle 100 ms ins Log übertragen
+        self.log_buffer = LogBuffer(self.LOG_MAX_LINES)
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(100)
+        self.log_timer.timeout.connect(self._flush_log)
+        self.log_timer.start()
         self.signals = ConversionSignals()
 
-        self.signals.log_signal.connect(self._safe_append_log)
         self.signals.file_label_signal.connect(self._safe_set_file_label)
-        self.signals.file_progress_signal.connect(self._safe_set_file_progress)
+        self.signals.job_label_signal.connect(self._safe_set_job_label)
+        self.signals.job_progress_signal.connect(self._safe_set_job_progress)
+        self.signals.job_stats_signal.connect(self._safe_set_job_stats)
+        self.signals.chunk_progress_signal.connect(self._safe_set_chunk_progress)
         self.signals.total_progress_signal.connect(self._safe_set_total_progress)
         self.signals.finished_signal.connect(self._on_conversion_finished)
+        self.signals.gpu_signal.connect(self._safe_set_gpu)
 
         self._apply_styles()
         self._init_ui()
@@ -269,9 +166,13 @@ class VideoConverterWindow(QMainWindow):
         grid_gpu.setVerticalSpacing(6)
 
         grid_gpu.addWidget(QLabel("Erkannte GPU:"), 0, 0)
-        self.gpu_entry = QLineEdit(detect_gpu_short())
+        self.gpu_entry = QLineEdit("Wird erkannt …")
         self.gpu_entry.setReadOnly(True)
         grid_gpu.addWidget(self.gpu_entry, 0, 1)
+        self.rescan_btn = QPushButton("Neu erkennen")
+        self.rescan_btn.setToolTip("Grafikkarten und Hardware-Encoder erneut prüfen (z. B. nach dem Anschließen einer eGPU).")
+        self.rescan_btn.clicked.connect(self.on_rescan_gpu)
+        grid_gpu.addWidget(self.rescan_btn, 0, 2)
 
         grid_gpu.addWidget(QLabel("GPU / CPU Wahl:"), 1, 0)
         self.gpu_combo = QComboBox()
@@ -328,7 +229,10 @@ class VideoConverterWindow(QMainWindow):
 
         grid_vopts.addWidget(QLabel("Qualität Modus:"), 5, 0)
         self.quality_combo = QComboBox()
-        self.quality_combo.addItems(["CQ (Qualitätsbasiert)", "Bitrate (kbit/s)", "Zieldateigröße (MB)"])
+        self.quality_combo.addItems([
+            "CQ (Qualitätsbasiert)", "Bitrate (kbit/s)", "Zieldateigröße (MB)",
+            "Zielqualität (SSIM)", "Zielqualität (VMAF)"
+        ])
         self.quality_combo.currentIndexChanged.connect(self.on_quality_mode_changed)
         grid_vopts.addWidget(self.quality_combo, 5, 1)
 
@@ -340,7 +244,7 @@ class VideoConverterWindow(QMainWindow):
 
         grid_vopts.addWidget(QLabel("Analyse-Stufe:"), 7, 0)
         self.preset_combo = QComboBox()
-        self.preset_combo.addItems(["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow"])
+        self.preset_combo.addItems(PRESETS + AUTO_PRESETS)
         self.preset_combo.setCurrentIndex(5)
         grid_vopts.addWidget(self.preset_combo, 7, 1)
 
@@ -403,6 +307,9 @@ class VideoConverterWindow(QMainWindow):
         grid_time.addWidget(QLabel("Dauer (sek):"), 1, 0)
         self.duration_limit_entry = QLineEdit("0")
         grid_time.addWidget(self.duration_limit_entry, 1, 1)
+        self.smart_cut_chk = QCheckBox("Schnell schneiden (Smart-Cut)")
+        self.smart_cut_chk.setToolTip("Kopiert den Bereich zwischen den Keyframes unverändert und kodiert nur die Ränder neu.\nBehält den Codec der Quelle; Codec-, Qualitäts- und Skalierungs-Einstellungen gelten dann nicht.")
+        grid_time.addWidget(self.smart_cut_chk, 2, 1)
 
         tab_audio_vbox.addLayout(grid_time)
         tab_audio_vbox.addStretch()
@@ -442,6 +349,36 @@ class VideoConverterWindow(QMainWindow):
         self.keep_rotation_chk.setChecked(True)
         tab_export_vbox.addWidget(self.keep_rotation_chk)
 
+        jobs_hbox = QHBoxLayout()
+        jobs_lbl = QLabel("Parallele Jobs:")
+        jobs_lbl.setToolTip("Anzahl gleichzeitig laufender ffmpeg-Prozesse.\nAutomatisch: CPU-Kerne / 4 für Software-Encoder, 2 für GPU-Encoder.")
+        jobs_hbox.addWidget(jobs_lbl)
+        self.jobs_spin = QSpinBox()
+        self.jobs_spin.setRange(0, os.cpu_count() or 1)
+        self.jobs_spin.setSpecialValueText("Automatisch")
+        self.jobs_spin.setValue(0)
+        jobs_hbox.addWidget(self.jobs_spin)
+        tab_export_vbox.addLayout(jobs_hbox)
+
+        self.chunked_chk = QCheckBox("Lange Dateien aufteilen (Chunks)")
+        self.chunked_chk.setToolTip("Teilt jede Datei an Keyframes in Stücke, kodiert diese parallel auf allen Kernen\nund fügt sie verlustfrei zusammen. Nur für Software-Encoder.")
+        tab_export_vbox.addWidget(self.chunked_chk)
+        self.background_chk = QCheckBox("Im Hintergrund (niedrige Priorität)")
+        self.background_chk.setToolTip("Kodiert mit niedrigster CPU- und I/O-Priorität und hält die Kodierung an,\nsolange andere Programme den Rechner stark auslasten.")
+        tab_export_vbox.addWidget(self.background_chk)
+        self.scratch_chk = QCheckBox("Lokal zwischenspeichern (Netzlaufwerke)")
+        self.scratch_chk.setToolTip(f"Kodiert zunächst nach {SCRATCH_DIR} und verschiebt erst fertige Dateien ins Ziel.\nVor jedem Job wird der freie Speicherplatz geprüft.")
+        tab_export_vbox.addWidget(self.scratch_chk)
+
+        reuse_hbox = QHBoxLayout()
+        reuse_lbl = QLabel("Bereits kodierte Dateien:")
+        reuse_lbl.setToolTip("Erkennt Eingaben, die schon mit identischen Einstellungen kodiert wurden (Größe, Datum und Inhaltsprüfsumme).\nÜberspringen: vorhandenes Ergebnis behalten · Hardlink: Ergebnis ohne Speicherplatz im neuen Zielordner ablegen.")
+        reuse_hbox.addWidget(reuse_lbl)
+        self.reuse_combo = QComboBox()
+        self.reuse_combo.addItems(["Überspringen", "Hardlink anlegen", "Immer neu kodieren"])
+        reuse_hbox.addWidget(self.reuse_combo)
+        tab_export_vbox.addLayout(reuse_hbox)
+
         sep4 = QFrame()
         sep4.setFrameShape(QFrame.Shape.HLine)
         tab_export_vbox.addWidget(sep4)
@@ -460,14 +397,19 @@ class VideoConverterWindow(QMainWindow):
         self.cancel_btn.clicked.connect(self.cancel_conversion)
         action_grid.addWidget(self.cancel_btn, 0, 1)
 
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.setEnabled(False)
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        action_grid.addWidget(self.pause_btn, 1, 0, 1, 2)
+
         self.exit_btn = QPushButton("Programm beenden")
         self.exit_btn.setObjectName("btn-exit")
         self.exit_btn.clicked.connect(self.close)
-        action_grid.addWidget(self.exit_btn, 1, 0)
+        action_grid.addWidget(self.exit_btn, 2, 0)
 
         self.reset_btn = QPushButton("Reset")
         self.reset_btn.clicked.connect(self.on_reset_all)
-        action_grid.addWidget(self.reset_btn, 1, 1)
+        action_grid.addWidget(self.reset_btn, 2, 1)
 
         tab_export_vbox.addLayout(action_grid)
         tab_export_vbox.addStretch()
@@ -490,6 +432,11 @@ class VideoConverterWindow(QMainWindow):
         self.file_progress.setValue(0)
         right_vbox.addWidget(self.file_progress)
 
+        # Zusätzliche Fortschrittszeilen für parallel laufende Jobs
+        self.job_rows = [(self.file_label, self.file_progress)]
+        self.job_rows_vbox = QVBoxLayout()
+        right_vbox.addLayout(self.job_rows_vbox)
+
         self.total_label = QLabel("Gesamtfortschritt")
         self.total_label.setProperty("class", "prog-label")
         right_vbox.addWidget(self.total_label)
@@ -501,14 +448,29 @@ class VideoConverterWindow(QMainWindow):
 
         self.log_view = QTextEdit()
         self.log_view.setReadOnly(True)
+        self.log_view.document().setMaximumBlockCount(self.LOG_MAX_LINES)
         right_vbox.addWidget(self.log_view, stretch=1)
 
     # -------------------- Logic & Handlers --------------------
+    def _detect_hardware(self):
+        """Hintergrund-Thread: GPU-Erkennung und Encoder-Prüfung halten den Fensteraufbau nicht auf."""
+        self.signals.gpu_signal.emit(detect_gpu_short())
+        warm_up_encoders()
+
+    def _safe_set_gpu(self, text):
+        self.gpu_entry.setText(text)
+        self._check_codec_hardware_support()
+
+    def on_rescan_gpu(self):
+        self.gpu_entry.setText(rescan_hardware())
+        self._check_codec_hardware_support()
+        threading.Thread(target=warm_up_encoders, daemon=True).start()
+
     def _check_codec_hardware_support(self, *args):
         codec = self.video_combo.currentText() or ""
         gpu_sel = self.gpu_combo.currentText() or ""
 
-        detected_gpu = detect_gpu_short()
+        detected_gpu = self.gpu_entry.text()
         gpu = detected_gpu if "Automatisch" in gpu_sel else gpu_sel.upper()
 
         warning_text = ""
@@ -568,12 +530,14 @@ class VideoConverterWindow(QMainWindow):
     def on_reset_all(self):
         self.selected_files.clear()
         self.file_list.clear()
+        self._ensure_job_rows(1)
         self.file_progress.setValue(0)
         self.total_progress.setValue(0)
         self.file_label.setText("Fortschritt: Keine Datei aktiv")
         self.log_view.clear()
         self.start_entry.setText("00:00:00")
         self.duration_limit_entry.setText("0")
+        self.smart_cut_chk.setChecked(False)
         self.gpu_combo.setCurrentIndex(0)
         self.format_combo.setCurrentIndex(0)
         self._update_video_codecs_for_container()
@@ -590,6 +554,11 @@ class VideoConverterWindow(QMainWindow):
         self.target_entry.setText("")
         self.save_in_source_chk.setChecked(False)
         self.keep_rotation_chk.setChecked(True)
+        self.jobs_spin.setValue(0)
+        self.chunked_chk.setChecked(False)
+        self.background_chk.setChecked(False)
+        self.scratch_chk.setChecked(False)
+        self.reuse_combo.setCurrentIndex(0)
         self._check_codec_hardware_support()
 
     def on_quality_mode_changed(self, index):
@@ -601,6 +570,12 @@ class VideoConverterWindow(QMainWindow):
         elif "Bitrate" in m:
             self.quality_label.setText("kbit/s:")
             self.quality_entry.setText("5000")
+        elif "SSIM" in m:
+            self.quality_label.setText("SSIM (0-1):")
+            self.quality_entry.setText("0.98")
+        elif "VMAF" in m:
+            self.quality_label.setText("VMAF (0-100):")
+            self.quality_entry.setText("93")
         else:
             self.quality_label.setText("MB:")
             self.quality_entry.setText("700")
@@ -627,7 +602,12 @@ class VideoConverterWindow(QMainWindow):
             self.target_entry.setText(folder)
 
     def on_open_preview(self):
-        if not self.selected_files or not VideoPreviewDialog:
+        if not self.selected_files:
+            return
+        # Vorschau erst beim Öffnen laden – hält den Programmstart schlank
+        try:
+            from video_preview import VideoPreviewDialog
+        except ImportError:
             return
 
         dialog = VideoPreviewDialog(self, self.selected_files[0])
@@ -638,162 +618,91 @@ class VideoConverterWindow(QMainWindow):
             duration_diff = max(0.0, e - s)
             self.duration_limit_entry.setText(f"{duration_diff:.2f}")
 
-    def build_ffmpeg_args(self, infile, outfile):
-        sel_text = self.gpu_combo.currentText()
-        keep_rotation = self.keep_rotation_chk.isChecked()
-        container_choice = self.format_combo.currentText()
-        is_webm = "WebM" in container_choice
-
-        if "NVIDIA" in sel_text: hw_mode = "NVIDIA"
-        elif "AMD" in sel_text: hw_mode = "AMD"
-        elif "Intel" in sel_text: hw_mode = "INTEL"
-        elif "Software" in sel_text: hw_mode = "CPU"
-        else: hw_mode = detect_gpu_short().upper()
-
-        vchoice, achoice = self.video_combo.currentText(), self.audio_combo.currentText()
-        qmode, qval_raw = self.quality_combo.currentText(), self.quality_entry.text()
-        upscale = self.dimension_combo.currentText()
-        sharpen_mode = self.sharpen_combo.currentText()
-        preset = self.preset_combo.currentText()
-        audio_copy = self.audio_copy_chk.isChecked()
-        target_lufs = int(self.volume_spin.value())
-        is_10bit = "10-Bit" in self.bit_combo.currentText()
-
-        # Schärfe-Parameter
-        cas_val = None
-        unsharp_val = None
-        if "Leicht" in sharpen_mode:
-            cas_val = "0.3"
-            unsharp_val = "3:3:0.4:3:3:0.0"
-        elif "Mittel" in sharpen_mode:
-            cas_val = "0.5"
-            unsharp_val = "5:5:0.8:5:5:0.0"
-        elif "Stark" in sharpen_mode:
-            cas_val = "0.8"
-            unsharp_val = "7:7:1.2:7:7:0.0"
-
-        if is_webm:
-            if vchoice not in ["VP9", "AV1"]:
-                vchoice = "VP9"
-            audio_copy = False
-
-        args = []
-
-        if keep_rotation:
-            args += ["-noautorotate"]
-
-        # Hardware-Decoder-Optionen
-        if vchoice != "Nur Audio ändern" and hw_mode != "CPU":
-            if "NVIDIA" in hw_mode:
-                # Nutze -hwaccel cuda ohne erzwungenes output_format cuda,
-                # damit FFmpeg bei Bedarf automatisch zwischen GPU und CPU konvertiert
-                args += ["-hwaccel", "cuda"]
-            elif "INTEL" in hw_mode or "AMD" in hw_mode:
-                args += ["-hwaccel", "vaapi", "-hwaccel_output_format", "vaapi", "-hwaccel_device", "/dev/dri/renderD128"]
-
-        start_time = sanitize_time_str(self.start_entry.text(), "00:00:00")
-        if start_time != "00:00:00":
-            args += ["-ss", start_time]
-
-        args += ["-i", str(Path(infile).resolve())]
-
-        raw_dur = self.duration_limit_entry.text().strip().replace(',', '.')
-        try:
-            dur_float = float(raw_dur)
-            if dur_float > 0:
-                args += ["-t", f"{dur_float:.2f}"]
-        except ValueError:
-            pass
-
-        if vchoice == "Nur Audio ändern":
-            args += ["-c:v", "copy"]
-        else:
-            if "H.264" in vchoice: fmt = "H.264"
-            elif "H.265" in vchoice: fmt = "H.265"
-            elif "VP9" in vchoice: fmt = "VP9"
-            else: fmt = "AV1"
-
-            codec = _select_encoder(fmt, hw_mode)
-            args += _codec_quality_args(codec, qmode, qval_raw, preset, infile)
-
-            if is_10bit and "vaapi" not in codec and "nvenc" not in codec:
-                args += ["-pix_fmt", "yuv420p10le"]
-            elif not is_10bit and "vaapi" not in codec and "nvenc" not in codec:
-                args += ["-pix_fmt", "yuv420p"]
-
-            res_map = {"720p": "1280", "1080p": "1920", "1440p": "2560", "2160p": "3840"}
-            target_w = next((v for k, v in res_map.items() if k in upscale), None)
-
-            # --- Videofilter-Erstellung ---
-            vf_filters = []
-            if "nvenc" in codec:
-                if target_w:
-                    vf_filters.append(f"scale={target_w}:-2:flags=lanczos")
-                if unsharp_val:
-                    vf_filters.append(f"unsharp={unsharp_val}")
-                if vf_filters:
-                    args += ["-vf", ",".join(vf_filters)]
-            elif "vaapi" in codec:
-                vfmt = "p010le" if is_10bit else "nv12"
-                if unsharp_val:
-                    if target_w:
-                        vf_filters.append(f"scale_vaapi={target_w}:-2")
-                    vf_filters.append(f"hwdownload,format={vfmt}")
-                    vf_filters.append(f"unsharp={unsharp_val}")
-                    vf_filters.append(f"format={vfmt},hwupload")
-                else:
-                    if target_w:
-                        vf_filters.append(f"scale_vaapi={target_w}:-2,format=vaapi|{vfmt}")
-                    else:
-                        vf_filters.append(f"format=vaapi|{vfmt}")
-                if vf_filters:
-                    args += ["-vf", ",".join(vf_filters)]
-            else:
-                if target_w:
-                    vf_filters.append(f"scale={target_w}:-2:flags=lanczos")
-                if unsharp_val:
-                    vf_filters.append(f"unsharp={unsharp_val}")
-                if vf_filters:
-                    args += ["-vf", ",".join(vf_filters)]
-
-        if keep_rotation:
-            args += ["-metadata:s:v:0", "rotate=90"]
-
-        if audio_copy:
-            args += ["-c:a", "copy"]
-        else:
-            a_codec_map = {
-                "Opus (WebM/MKV)": "libopus",
-                "AAC": "aac",
-                "PCM": "pcm_s16le",
-                "FLAC (mkv)": "flac"
-            }
-            if is_webm:
-                a_codec = "libopus"
-            else:
-                a_codec = a_codec_map.get(achoice, "aac")
-
-            args += ["-c:a", a_codec]
-
-            audio_filters = []
-            if achoice == "PCM" or vchoice in ["AV1", "VP9"] or is_webm:
-                args += ["-ar", "48000"]
-                audio_filters.append("aresample=48000")
+    def _collect_settings(self):
+        """Liest alle Einstellungen im GUI-Thread aus, damit die Worker keine Widgets anfassen."""
+        return make_settings({
+            "hw_mode": self.gpu_combo.currentText(),
+            "container": self.format_combo.currentText(),
+            "video": self.video_combo.currentText(),
+            "audio": self.audio_combo.currentText(),
+            "audio_copy": self.audio_copy_chk.isChecked(),
+            "lufs": int(self.volume_spin.value()),
+            "quality_mode": self.quality_combo.currentText(),
+            "quality_value": self.quality_entry.text(),
+            "preset": self.preset_combo.currentText(),
+            "dimension": self.dimension_combo.currentText(),
+            "sharpen": self.sharpen_combo.currentText(),
+            "bit_depth": self.bit_combo.currentText(),
+            "keep_rotation": self.keep_rotation_chk.isChecked(),
+            "start": self.start_entry.text(),
+            "duration": self.duration_limit_entry.text(),
+            "smart_cut": self.smart_cut_chk.isChecked(),
+            "chunked": self.chunked_chk.isChecked(),
+            "reuse": self.reuse_combo.currentText(),
+            "output_dir": self.target_entry.text(),
+            "save_in_source": self.save_in_source_chk.isChecked(),
+        })
 
-            audio_filters.append(f"loudnorm=I={target_lufs}:TP=-1.5:LRA=11")
-            args += ["-af", ",".join(audio_filters)]
-
-        return args
+    def build_ffmpeg_args(self, infile, outfile):
+        return engine_build_ffmpeg_args(self._collect_settings(), infile, outfile)
 
     # -------------------- Threadsichere GUI Updates --------------------
-    def _safe_append_log(self, text):
-        self.log_view.append(text)
+    def _flush_log(self):
+        lines, dropped = self.log_buffer.drain()
+        if dropped:
+            lines.insert(0, f"[… {dropped} Zeilen ausgelassen – vollständiges Log siehe Log-Datei]")
+        if lines:
+            self.log_view.append("\n".join(lines))
 
     def _safe_set_file_label(self, text):
         self.file_label.setText(text)
 
-    def _safe_set_file_progress(self, val):
-        self.file_progress.setValue(int(val * 100))
+    def _safe_set_job_label(self, slot, text):
+        self.job_rows[slot][0].setProperty("base_text", text)
+        self.job_rows[slot][0].setText(text)
+
+    def _safe_set_job_progress(self, slot, val):
+        bar = self.job_rows[slot][1]
+        if val < 0:
+            # Dauer unbekannt: Laufanzeige statt Prozentwert
+            bar.setRange(0, 0)
+        else:
+            bar.setRange(0, 100)
+            bar.setValue(int(val * 100))
+
+    def _safe_set_job_stats(self, slot, record):
+        lbl = self.job_rows[slot][0]
+        stats = []
+        if record.fps is not None: stats.append(f"{record.fps:.0f} fps")
+        if record.speed is not None: stats.append(f"{record.speed:.2f}×")
+        if record.bitrate_kbps is not None: stats.append(f"{record.bitrate_kbps:.0f} kbit/s")
+        text = lbl.property("base_text") or ""
+        if stats:
+            text += " – " + " · ".join(stats)
+        lbl.setText(text)
+
+    def _safe_set_chunk_progress(self, slot, fractions):
+        # Ein Balkenzeichen je Stück: leer bis voll
+        bars = "".join(" ▁▂▃▄▅▆▇█"[round(f * 8)] for f in fractions)
+        finished = sum(1 for f in fractions if f >= 1.0)
+        lbl = self.job_rows[slot][0]
+        lbl.setText(f"{lbl.property('base_text') or ''} – Stücke {finished}/{len(fractions)} [{bars}]")
+
+    def _ensure_job_rows(self, count):
+        """Legt je parallelem Job eine Fortschrittszeile an und blendet überzählige aus."""
+        while len(self.job_rows) < count:
+            lbl = QLabel("")
+            lbl.setProperty("class", "prog-label")
+            bar = QProgressBar()
+            bar.setRange(0, 100)
+            self.job_rows_vbox.addWidget(lbl)
+            self.job_rows_vbox.addWidget(bar)
+            self.job_rows.append((lbl, bar))
+        for slot, (lbl, bar) in enumerate(self.job_rows[1:], 1):
+            lbl.setText(f"Job {slot + 1}: bereit")
+            bar.setValue(0)
+            lbl.setVisible(slot < count)
+            bar.setVisible(slot < count)
 
     def _safe_set_total_progress(self, val):
         self.total_progress.setValue(int(val * 100))
@@ -801,87 +710,83 @@ class VideoConverterWindow(QMainWindow):
     def _on_conversion_finished(self):
         self.start_btn.setEnabled(True)
         self.cancel_btn.setEnabled(False)
+        self.pause_btn.setEnabled(False)
+        self.pause_btn.setText("Pause")
 
     # -------------------- Konvertierungs-Thread --------------------
     def start_conversion(self):
         if not self.selected_files: return
+        settings = self._collect_settings()
+        self._start_jobs([{"input": f, "settings": settings} for f in self.selected_files])
+
+    def _offer_resume(self):
+        """Nach einem Absturz: unfertige Jobs des letzten Stapels (mit ihren damaligen Einstellungen) anbieten."""
+        jobs = self.journal.pending()
+        if not jobs:
+            return
+        answer = QMessageBox.question(
+            self, "Unterbrochene Konvertierung",
+            f"{len(jobs)} Datei(en) eines unterbrochenen Stapels wurden nicht fertig konvertiert.\n"
+            "Jetzt fortsetzen?"
+        )
+        if answer == QMessageBox.StandardButton.Yes:
+            self._start_jobs(self.journal.take_pending())
+        else:
+            self.journal.discard_pending()
+
+    def _start_jobs(self, jobs):
         self.start_btn.setEnabled(False)
         self.cancel_btn.setEnabled(True)
-        self.stop_event.clear()
+        self.pause_btn.setEnabled(True)
+        self.runner = BatchRunner(
+            jobs, workers=job_count(jobs[0]["settings"], self.jobs_spin.value()),
+            on_log=self.log_buffer.append,
+            on_job_label=self.signals.job_label_signal.emit,
+            on_job_progress=self.signals.job_progress_signal.emit,
+            on_total_progress=self.signals.total_progress_signal.emit,
+            on_job_stats=self.signals.job_stats_signal.emit,
+            on_chunk_progress=self.signals.chunk_progress_signal.emit,
+            journal=self.journal,
+            background=self.background_chk.isChecked(),
+            scratch_dir=SCRATCH_DIR if self.scratch_chk.isChecked() else None,
+        )
+        self._ensure_job_rows(self.runner.workers)
         threading.Thread(target=self.run_conversion, daemon=True).start()
 
     def cancel_conversion(self):
-        self.stop_event.set()
-        if self.current_proc:
-            self.current_proc.terminate()
-
-    def run_conversion(self):
-        total = len(self.selected_files)
-        container_choice = self.format_combo.currentText()
-        audio_format = self.audio_combo.currentText()
-
-        for idx, infile in enumerate(list(self.selected_files), 1):
-            if self.stop_event.is_set(): break
-            in_p = Path(infile).resolve()
-            self.signals.file_label_signal.emit(f"Fortschritt: {in_p.name}")
-
-            if container_choice and "WebM" in container_choice:
-                ext = ".webm"
-            elif audio_format and "FLAC" in audio_format:
-                ext = ".mkv"
-            elif container_choice and "MP4" in container_choice:
-                ext = ".mp4"
-            else:
-                ext = ".mkv"
-
-            target_val = self.target_entry.text().strip()
-            if self.save_in_source_chk.isChecked():
-                out_dir = in_p.parent
-            elif target_val:
-                out_dir = Path(target_val).resolve()
-            else:
-                out_dir = in_p.parent / "converted"
-
-            out_dir.mkdir(parents=True, exist_ok=True)
-            out_p = make_unique_path(out_dir / (in_p.stem + ext))
+        if self.runner:
+            self.runner.cancel()
 
-            dur_str = sanitize_time_str(self.duration_limit_entry.text(), "0")
-            dur = float(dur_str) if dur_str != "0" else (probe_duration_seconds(in_p) or 1.0)
-
-            cmd = ["ffmpeg"] + self.build_ffmpeg_args(str(in_p), str(out_p)) + ["-y", str(out_p)]
-
-            self.signals.log_signal.emit(f"\nSTART: {in_p.name}\n")
-            try:
-                self.current_proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
-                for line in self.current_proc.stdout:
-                    self.signals.log_signal.emit(line.strip())
-                    m = time_re.search(line)
-                    if m:
-                        pct = min(1.0, (int(m.group(1))*3600 + int(m.group(2))*60 + float(m.group(3))) / dur)
-                        self.signals.file_progress_signal.emit(pct)
-                        self.signals.total_progress_signal.emit((idx-1+pct)/total)
-
-                return_code = self.current_proc.wait()
-
-                if return_code != 0 and not self.stop_event.is_set():
-                    self.signals.log_signal.emit("FEHLER: Konvertierung fehlgeschlagen.\n")
-            except Exception as e:
-                self.signals.log_signal.emit(f"FEHLER: {e}\n")
+    def toggle_pause(self):
+        """Hält den Stapel an bzw. setzt ihn fort – ohne bereits kodierte Anteile zu verlieren."""
+        if not self.runner:
+            return
+        if self.runner.user_paused:
+            self.runner.resume()
+            self.pause_btn.setText("Pause")
+            self.log_buffer.append("Konvertierung fortgesetzt.")
+        else:
+            self.runner.pause()
+            self.pause_btn.setText("Fortsetzen")
+            self.log_buffer.append("Konvertierung pausiert.")
 
-        self.signals.log_signal.emit("\nFERTIG.\n")
+    def run_conversion(self):
+        self.runner.run()
+        if self.runner.summary():
+            self.log_buffer.append(self.runner.summary())
+        self.log_buffer.append("\nFERTIG.\n")
         self.signals.file_label_signal.emit("Konvertierung abgeschlossen")
         self.signals.finished_signal.emit()
 
-
-if __name__ == "__main__":
-    import os
+def main(on_shown=None):
+    """Startet das Fenster; der Starter ruft dies im selben Prozess auf (eine laufende QApplication wird übernommen)."""
     from PyQt6.QtGui import QIcon
 
     # Wichtig für die Taskleiste (Wayland/X11 Desktop-Matching):
     # Setzt die Anwendungsklasse passend zur StartupWMClass der .desktop-Datei
     os.environ["QT_QPA_PLATFORM_APP_ID"] = "guideos-videokonverter"
 
-    app = QApplication(sys.argv)
+    app = QApplication.instance() or QApplication(sys.argv)
     app.setDesktopFileName("guideos-videokonverter")
 
     # Lädt das Fenster- und Taskleisten-Icon direkt aus pixmaps
@@ -891,4 +796,12 @@ if __name__ == "__main__":
 
     window = VideoConverterWindow()
     window.show()
-    sys.exit(app.exec())
+    threading.Thread(target=window._detect_hardware, daemon=True).start()
+    if on_shown:
+        QTimer.singleShot(0, on_shown)
+    else:
+        QTimer.singleShot(0, window._offer_resume)
+    return app.exec()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,10 +6,20 @@
 # =======================================================================
 import sys
 import os
+import time
 import subprocess
-import argparse
+import statistics
+import importlib.util
 from pathlib import Path
 
+# Headless-Stapelbetrieb: ohne Qt-Import direkt an die Engine übergeben
+if __name__ == "__main__" and "--batch" in sys.argv[1:]:
+    from video_engine import main as batch_main
+    sys.exit(batch_main(sys.argv[1:]))
+if __name__ == "__main__" and "--benchmark" in sys.argv[1:]:
+    from video_bench import main as bench_main
+    sys.exit(bench_main([a for a in sys.argv[1:] if a != "--benchmark"]))
+
 from PyQt6.QtWidgets import (
     QApplication, QDialog, QVBoxLayout, QHBoxLayout,
     QLabel, QRadioButton, QPushButton, QMessageBox
@@ -19,6 +29,8 @@ from PyQt6.QtCore import Qt
 CONFIG_DIR = Path.home() / ".config" / "guideos-videokonverter"
 CONFIG_FILE = CONFIG_DIR / "layout.conf"
 APP_DIR = Path("/usr/lib/guideos-videokonverter")
+# Gesetzt in den Kindprozessen des Startzeit-Benchmarks
+BENCHMARK_ENV = "GUIDEOS_STARTUP_BENCHMARK"
 
 
 class LayoutSelectionDialog(QDialog):
@@ -112,7 +124,48 @@ def get_saved_layout():
     return None
 
 
+def load_layout(script_path):
+    """Lädt das Layout-Skript als Modul in diesen Prozess (kein zweiter Interpreter, kein zweiter Qt-Import)."""
+    sys.path.insert(0, str(script_path.parent))
+    spec = importlib.util.spec_from_file_location(script_path.stem.replace("-", "_"), script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def report_shown():
+    """Benchmark-Kindprozess: meldet das erste angezeigte Fenster und beendet sich."""
+    print("shown", flush=True)
+    QApplication.instance().quit()
+
+
+def run_startup_benchmark(runs):
+    """Misst `runs`-mal die Zeit vom Prozessstart bis zum ersten angezeigten Fenster (frischer Interpreter je Lauf)."""
+    env = dict(os.environ, **{BENCHMARK_ENV: "1"})
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, str(Path(__file__).resolve())], env=env,
+                                stdout=subprocess.PIPE, text=True)
+        line = proc.stdout.readline()
+        elapsed = time.perf_counter() - t0
+        proc.wait()
+        if line.strip() != "shown":
+            print("Fenster wurde nicht angezeigt.", file=sys.stderr)
+            return 1
+        times.append(elapsed * 1000)
+        print(f"{elapsed * 1000:7.0f} ms")
+    print(f"Median {statistics.median(times):.0f} ms · min {min(times):.0f} ms · max {max(times):.0f} ms ({runs} Läufe)")
+    return 0
+
+
 def main():
+    if "--startup-benchmark" in sys.argv:
+        pos = sys.argv.index("--startup-benchmark")
+        runs = sys.argv[pos + 1] if pos + 1 < len(sys.argv) else ""
+        sys.exit(run_startup_benchmark(int(runs) if runs.isdigit() else 5))
+    benchmark = os.environ.get(BENCHMARK_ENV) == "1"
+
     # Prüft direkt in sys.argv, ob --select oder -s vorhanden ist
     force_select = "--select" in sys.argv or "-s" in sys.argv
 
@@ -124,6 +177,11 @@ def main():
     # Nur wenn --select NICHT vorhanden ist, versuchen wir den Standard zu laden
     if not force_select:
         selected_layout = get_saved_layout()
+    if benchmark and not selected_layout:
+        selected_layout = "q"
+
+    # Muss vor dem Anlegen der QApplication gesetzt sein (Taskleisten-Zuordnung)
+    os.environ["QT_QPA_PLATFORM_APP_ID"] = "guideos-videokonverter"
 
     # Falls kein Standard existiert ODER --select erzwungen wurde -> Dialog anzeigen
     if not selected_layout:
@@ -152,9 +210,9 @@ def main():
 
     if script_path.exists():
         # Reicht nur die restlichen Argumente weiter
-        cmd = [sys.executable, str(script_path)] + filtered_args
-        subprocess.Popen(cmd)
-        sys.exit(0)
+        sys.argv = [str(script_path)] + filtered_args
+        layout = load_layout(script_path)
+        sys.exit(layout.main(report_shown if benchmark else None))
     else:
         if not QApplication.instance():
             app = QApplication(sys.argv)
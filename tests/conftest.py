@@ -0,0 +1,23 @@
+# Die Module liegen ohne Paketstruktur im Wurzelverzeichnis des Repositorys
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import video_engine  # noqa: E402
+import video_probe  # noqa: E402
+
+
+@pytest.fixture
+def fake_source(monkeypatch):
+    """Quelle mit 200 s Laufzeit, H.264 und einem Keyframe alle 2 s."""
+    monkeypatch.setattr(video_probe, "keyframes", lambda path, register=None: array("d", range(0, 200, 2)))
+    monkeypatch.setattr(video_probe, "duration", lambda path: 200.0)
+    monkeypatch.setattr(video_probe, "video_stream", lambda path: {
+        "codec_name": "h264", "pix_fmt": "yuv420p", "profile": "High", "level": 41, "refs": 1, "width": 1920,
+    })
+    monkeypatch.setattr(video_engine, "_select_encoder", lambda fmt, hw: "libx264")
+    return "quelle.mp4"
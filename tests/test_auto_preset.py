@@ -0,0 +1,73 @@
+# Tests der automatischen Preset-Wahl (Probekodierungen werden simuliert)
+import json
+
+import pytest
+
+import video_engine
+from video_engine import BatchRunner, EncodeStats, choose_preset, make_settings
+
+SPEEDS = {"ultrafast": 9.0, "superfast": 7.0, "veryfast": 5.0, "faster": 4.0, "fast": 3.0,
+          "medium": 2.5, "slow": 1.5, "slower": 0.8, "veryslow": 0.4}
+
+
+def _stats(speed, returncode=0):
+    return EncodeStats(returncode, 4.0, 4.0, 0, None, speed)
+
+@pytest.fixture
+def preset_cache(tmp_path, monkeypatch):
+    path = tmp_path / "presets.json"
+    monkeypatch.setattr(video_engine, "PRESET_CACHE", path)
+    return path
+
+def test_choose_preset_picks_slowest_preset_reaching_target(fake_source, preset_cache):
+    settings = make_settings({"hw_mode": "Software (CPU)"})
+    measure = lambda cmd: _stats(SPEEDS[cmd[cmd.index("-preset") + 1]])
+    assert choose_preset(settings, fake_source, 2.0, measure) == ("medium", 2.5)
+
+def test_choose_preset_does_not_cache_discarded_samples(fake_source, preset_cache):
+    settings = make_settings({"hw_mode": "Software (CPU)"})
+
+    def measure(cmd):
+        preset = cmd[cmd.index("-preset") + 1]
+        # Angehaltene Probe: None statt eines zu niedrigen Tempos
+        return None if preset == "medium" else _stats(SPEEDS[preset])
+
+    assert choose_preset(settings, fake_source, 2.0, measure)[0] == "fast"
+    cached = json.loads(preset_cache.read_text())
+    speeds = next(iter(cached.values()))
+    assert "medium" not in speeds and speeds["fast"] == 3.0
+
+class FakeProc:
+    pid = 4242
+
+    def send_signal(self, sig):
+        pass
+
+def test_suspended_sample_is_repeated(monkeypatch):
+    runner = BatchRunner([], log_dir=None, background=True)
+    calls = []
+
+    def measure_ffmpeg(cmd, register=None, prefix=()):
+        calls.append(prefix)
+        # Die erste Probe startet während einer Drosselung
+        runner._suspended = len(calls) == 1
+        register(FakeProc())
+        return _stats(1.0 if len(calls) == 1 else 2.0)
+
+    monkeypatch.setattr(video_engine, "measure_ffmpeg", measure_ffmpeg)
+    assert runner._measure_sample(["ffmpeg"]).speed == 2.0
+    assert len(calls) == 2
+    assert calls[0][:3] == ["nice", "-n", "19"]
+    assert not runner.running_procs
+
+def test_sample_giving_up_after_retries(monkeypatch):
+    runner = BatchRunner([], log_dir=None)
+
+    def measure_ffmpeg(cmd, register=None, prefix=()):
+        runner._suspended = True
+        register(FakeProc())
+        runner._suspended = False
+        return _stats(1.0)
+
+    monkeypatch.setattr(video_engine, "measure_ffmpeg", measure_ffmpeg)
+    assert runner._measure_sample(["ffmpeg"]) is None
@@ -0,0 +1,66 @@
+# Tests der Encoder-Erkennung (die ffmpeg-Ausgaben sind nachgebildet)
+import subprocess
+
+import pytest
+
+import video_engine
+import video_probe
+
+ENCODERS = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ A....D aac                  AAC (Advanced Audio Coding)
+ S..... srt                  SubRip subtitle
+"""
+HWACCELS = "Hardware acceleration methods:\nvdpau\ncuda\nvaapi\n\n"
+FILTERS = """Filters:
+  T.. = Timeline support
+ ... loudnorm           A->A       EBU R128 loudness normalization
+ T.. unsharp            V->V       Sharpen or blur the input video.
+ ... libvmaf            VV->V      Calculate the VMAF between two video streams.
+"""
+OUTPUTS = {"-encoders": ENCODERS, "-hwaccels": HWACCELS, "-filters": FILTERS}
+
+
+@pytest.fixture
+def ffmpeg(tmp_path, monkeypatch):
+    binary = tmp_path / "ffmpeg"
+    binary.write_text("")
+    monkeypatch.setattr(video_probe, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(video_engine.shutil, "which", lambda name: str(binary))
+    monkeypatch.setattr(video_engine, "_capabilities", None)
+    monkeypatch.setattr(video_engine, "_failed_tests", set())
+    monkeypatch.setattr(video_engine, "_ffmpeg_output", lambda arg: OUTPUTS[arg])
+    return binary
+
+def test_scan_capabilities_parses_listings(ffmpeg):
+    caps, complete = video_engine._scan_capabilities()
+    assert complete
+    assert caps["encoders"] == {"libx264": "V", "h264_nvenc": "V", "aac": "A", "srt": "S"}
+    assert caps["hwaccels"] == ["vdpau", "cuda", "vaapi"]
+    assert caps["filters"] == ["loudnorm", "unsharp", "libvmaf"]
+
+def test_failed_scan_is_not_cached(ffmpeg, monkeypatch):
+    def broken(arg):
+        if arg == "-filters":
+            raise subprocess.CalledProcessError(1, "ffmpeg")
+        return OUTPUTS[arg]
+
+    monkeypatch.setattr(video_engine, "_ffmpeg_output", broken)
+    assert video_engine.capabilities()["encoders"]
+    assert video_probe.load_json(ffmpeg, "capabilities") is None
+
+def test_only_successful_encoder_tests_are_persisted(ffmpeg, monkeypatch):
+    monkeypatch.setattr(video_engine, "_test_encode", lambda encoder: encoder == "libx264")
+    assert video_engine.is_encoder_available("libx264")
+    assert not video_engine.is_encoder_available("h264_nvenc")
+    assert not video_engine.is_encoder_available("libx265")
+    assert video_probe.load_json(ffmpeg, "capabilities")["usable"] == {"libx264": True}
+    # Ein neuer Prozess prüft den fehlgeschlagenen Encoder erneut
+    monkeypatch.setattr(video_engine, "_capabilities", None)
+    monkeypatch.setattr(video_engine, "_failed_tests", set())
+    monkeypatch.setattr(video_engine, "_test_encode", lambda encoder: True)
+    assert video_engine.is_encoder_available("h264_nvenc")
@@ -0,0 +1,18 @@
+# Tests der Chunk-Planung (Keyframes werden simuliert)
+import pytest
+
+from video_engine import chunk_plan, make_settings
+
+
+def test_chunk_plan_uses_keyframes_and_covers_range(fake_source):
+    settings = make_settings({"hw_mode": "Software (CPU)", "chunked": True})
+    plan = chunk_plan(settings, fake_source, 2)
+    assert len(plan) == 4
+    assert plan[0][0] == 0
+    assert all(start % 2 == 0 for start, _ in plan)
+    assert sum(length for _, length in plan) == pytest.approx(200.0)
+
+def test_chunk_plan_skips_short_or_single_worker(fake_source):
+    assert chunk_plan(make_settings({"hw_mode": "Software (CPU)"}), fake_source, 1) is None
+    short = make_settings({"hw_mode": "Software (CPU)", "duration": "40"})
+    assert chunk_plan(short, fake_source, 4) is None
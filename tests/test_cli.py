@@ -0,0 +1,49 @@
+# Tests der Kommandozeile und der Manifest-Einträge
+import pytest
+
+from video_engine import (
+    build_arg_parser, cut_range, job_encoder, make_settings, manifest_settings, output_extension,
+    settings_from_args,
+)
+
+
+def _base(*argv):
+    return settings_from_args(build_arg_parser().parse_args(list(argv)))
+
+def test_manifest_values_use_the_cli_names():
+    row = {"input": "a.mp4", "video": "h265", "hw_mode": "cpu", "quality_mode": "cq", "quality_value": "24", "container": "webm"}
+    settings = manifest_settings(row, _base())
+    # WebM erzwingt VP9, CQ bleibt CQ
+    assert job_encoder(settings) == "libvpx-vp9"
+    assert "CQ" in settings["quality_mode"] and settings["quality_value"] == "24"
+    assert output_extension(settings) == ".webm"
+
+def test_manifest_accepts_gui_texts_and_fills_quality_default():
+    settings = manifest_settings({"input": "a.mp4", "video": "H.265", "quality_mode": "size", "preset": "auto:2"}, _base())
+    assert settings["video"] == "H.265"
+    assert settings["quality_value"] == "700"
+    assert settings["preset"] == "Auto (Ziel: 2× Echtzeit)"
+
+@pytest.mark.parametrize("row", [
+    {"input": "a.mp4", "video": "h266"},
+    {"input": "a.mp4", "container": "avi"},
+    {"input": "a.mp4", "codec": "h264"},
+    {"input": "a.mp4", "duration": "eine Minute"},
+    {"input": "a.mp4", "preset": "turbo"},
+])
+def test_manifest_rejects_unknown_columns_and_values(row):
+    with pytest.raises(ValueError):
+        manifest_settings(row, _base())
+
+def test_duration_accepts_clock_format():
+    opts = build_arg_parser().parse_args(["--start", "1:30", "--duration", "00:00:30", "x.mp4"])
+    assert cut_range(settings_from_args(opts)) == (90.0, 30.0)
+    assert cut_range(make_settings({"duration": "12,5"})) == (0.0, 12.5)
+
+@pytest.mark.parametrize("argv", [["--duration", "30s"], ["--preset", "schnell"], ["--preset", "auto:0"]])
+def test_invalid_duration_or_preset_is_a_usage_error(argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        build_arg_parser().parse_args(argv)
+    assert exc.value.code == 2
+    err = capsys.readouterr().err
+    assert "Ungültige Zeitangabe" in err or "Preset" in err
@@ -0,0 +1,35 @@
+# Tests des Vorschaubild-Caches (video_preview braucht PyQt6)
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from video_preview import FrameCache  # noqa: E402
+
+
+def test_frame_cache_prefers_exact_then_next_larger_height():
+    cache = FrameCache(max_mb=1)
+    cache.put(5, 360, b"a" * 10)
+    cache.put(5, 720, b"b" * 20)
+    cache.put(5, 1080, b"c" * 30)
+    assert cache.get(5, 720) == (b"b" * 20, 720)
+    assert cache.get(5, 480) == (b"b" * 20, 720)
+    assert cache.get(5, 1440) is None
+    assert cache.get(6, 360) is None
+
+def test_frame_cache_evicts_least_recently_used_over_limit():
+    cache = FrameCache(max_mb=100 / (1024 * 1024))
+    cache.put(1, 360, b"x" * 40)
+    cache.put(2, 360, b"y" * 40)
+    cache.get(1, 360)
+    cache.put(3, 360, b"z" * 40)
+    assert cache.size == 80
+    assert cache.get(2, 360) is None
+    assert cache.get(1, 360) is not None
+
+def test_frame_cache_replaces_entry_and_keeps_oversized_single_frame():
+    cache = FrameCache(max_mb=100 / (1024 * 1024))
+    cache.put(1, 360, b"x" * 40)
+    cache.put(1, 360, b"x" * 60)
+    assert cache.size == 60
+    cache.put(2, 360, b"y" * 500)
+    assert cache.size == 500 and cache.get(2, 360)
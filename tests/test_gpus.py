@@ -0,0 +1,43 @@
+# Tests der Grafikkarten-Erkennung über sysfs (nachgebildeter /sys/class/drm-Baum)
+import pytest
+
+import video_engine
+
+
+def _card(drm, name, vendor):
+    device = drm / name / "device"
+    device.mkdir(parents=True)
+    (device / "vendor").write_text(vendor + "\n")
+
+@pytest.fixture
+def drm(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_engine, "DRM_DIR", tmp_path)
+    monkeypatch.setattr(video_engine, "_gpus", None)
+    return tmp_path
+
+def test_scan_gpus_maps_vendors_and_render_nodes(drm):
+    _card(drm, "card0", "0x8086")
+    _card(drm, "renderD128", "0x8086")
+    _card(drm, "card1", "0x10de")
+    _card(drm, "renderD129", "0x1002")
+    _card(drm, "card0-HDMI-A-1", "0x8086")
+    (drm / "version").write_text("drm 1.1.0\n")
+    assert video_engine.scan_gpus() == {"INTEL": "/dev/dri/renderD128", "NVIDIA": None, "AMD": "/dev/dri/renderD129"}
+    assert video_engine.detect_gpu_short() == "NVIDIA"
+    assert video_engine.render_node("INTEL") == "/dev/dri/renderD128"
+    # NVIDIA hat keinen eigenen Render-Node: erster AMD/Intel-Node
+    assert video_engine.render_node("NVIDIA") == "/dev/dri/renderD129"
+
+def test_scan_gpus_is_cached_until_rescan(drm):
+    assert video_engine.scan_gpus() == {}
+    assert video_engine.detect_gpu_short() == "CPU"
+    assert video_engine.render_node() == video_engine.DEFAULT_RENDER_NODE
+    _card(drm, "renderD128", "0x1002")
+    assert video_engine.scan_gpus() == {}
+    assert video_engine.scan_gpus(rescan=True) == {"AMD": "/dev/dri/renderD128"}
+
+def test_scan_gpus_ignores_unknown_vendors_and_missing_dir(drm, monkeypatch):
+    _card(drm, "card0", "0x1af4")
+    assert video_engine.scan_gpus() == {}
+    monkeypatch.setattr(video_engine, "DRM_DIR", drm / "fehlt")
+    assert video_engine.scan_gpus(rescan=True) == {}
@@ -0,0 +1,85 @@
+# Tests des Auftrags-Journals
+import fcntl
+import json
+import os
+import subprocess
+import threading
+
+import pytest
+
+from video_journal import Journal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return Journal(tmp_path / "journal.jsonl")
+
+def _jobs(*names):
+    return [{"input": name, "output": None, "settings": {"video": "H.264"}} for name in names]
+
+def _orphan(journal):
+    """Gibt alle Stapel einem bereits beendeten Prozess – wie nach einem Absturz."""
+    proc = subprocess.Popen(["true"])
+    proc.wait()
+    lines = []
+    for line in journal.path.read_text().splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # Unvollständige Zeilen unverändert lassen
+            lines.append(line)
+            continue
+        record["pid"] = proc.pid
+        lines.append(json.dumps(record))
+    journal.path.write_text("".join(line + "\n" for line in lines))
+
+def test_pending_returns_unfinished_jobs_in_order(journal):
+    batch = journal.start_batch(_jobs("a.mp4", "b.mp4", "c.mp4"))
+    journal.update(batch, 0, "done")
+    journal.update(batch, 1, "running", output="/out/b.mp4")
+    journal.update(batch, 2, "failed")
+    _orphan(journal)
+    assert journal.pending() == [
+        {"input": "b.mp4", "output": "/out/b.mp4", "settings": {"video": "H.264"}, "batch": batch},
+    ]
+
+def test_pending_skips_batches_of_live_processes(journal):
+    journal.start_batch(_jobs("a.mp4"))
+    assert journal.pending() == []
+
+def test_take_pending_removes_batches(journal):
+    batch = journal.start_batch(_jobs("a.mp4", "b.mp4"))
+    journal.update(batch, 0, "done")
+    _orphan(journal)
+    assert [j["input"] for j in journal.take_pending()] == ["b.mp4"]
+    assert journal.pending() == []
+    assert not journal.path.exists()
+
+def test_truncated_last_line_is_ignored_and_terminated(journal):
+    batch = journal.start_batch(_jobs("a.mp4"))
+    with open(journal.path, "ab") as fh:
+        fh.write(b'{"batch": "x", "idx"')
+    journal.update(batch, 0, "done")
+    assert journal.path.read_text().splitlines()[-1].startswith("{")
+    _orphan(journal)
+    assert journal.pending() == []
+
+def test_finish_batch_drops_only_that_batch(journal):
+    first = journal.start_batch(_jobs("a.mp4"))
+    journal.start_batch(_jobs("b.mp4"))
+    journal.finish_batch(first)
+    _orphan(journal)
+    assert [j["input"] for j in journal.pending()] == ["b.mp4"]
+
+def test_writes_wait_for_the_lock_of_another_instance(journal):
+    batch = journal.start_batch(_jobs("a.mp4"))
+    # flock gilt je geöffneter Datei – ein eigener Deskriptor verhält sich wie eine zweite Instanz
+    fd = os.open(journal.lock_path, os.O_RDWR)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    writer = threading.Thread(target=journal.finish_batch, args=(batch,))
+    writer.start()
+    writer.join(0.2)
+    assert writer.is_alive() and journal.path.exists()
+    os.close(fd)
+    writer.join(5)
+    assert not journal.path.exists()
@@ -0,0 +1,38 @@
+# Tests des Keyframe-Index von video_probe (ffprobe wird simuliert)
+import io
+
+import pytest
+
+import video_probe
+
+
+class FakeProc:
+    def __init__(self, output):
+        self.stdout = io.StringIO(output)
+
+    def wait(self):
+        return 0
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_probe, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(video_probe, "_keyframe_memory", type(video_probe._keyframe_memory)())
+    monkeypatch.setattr(video_probe.shutil, "which", lambda name: f"/usr/bin/{name}")
+    path = tmp_path / "aufnahme.ts"
+    path.write_bytes(b"\0" * 188)
+    return path
+
+def test_keyframes_are_relative_to_start_time(source, monkeypatch):
+    monkeypatch.setattr(video_probe, "probe", lambda path: {"format": {"start_time": "1.400000"}})
+    output = "1.400000,K__\n1.440000,___\n3.400000,K__\nN/A,K__\n5.400000,K_D\n"
+    monkeypatch.setattr(video_probe.subprocess, "Popen", lambda *a, **kw: FakeProc(output))
+    assert list(video_probe.keyframes(source)) == pytest.approx([0.0, 2.0, 4.0])
+
+def test_keyframe_lookups():
+    times = [0.0, 2.0, 4.0]
+    assert video_probe.keyframe_before(times, 3.9) == 2.0
+    assert video_probe.keyframe_before(times, 4.0) == 4.0
+    assert video_probe.keyframe_after(times, 2.1) == 4.0
+    assert video_probe.keyframe_after(times, 4.1) is None
+    assert video_probe.nearest_keyframe(times, 2.9) == 2.0
@@ -0,0 +1,33 @@
+# Tests des Log-Puffers und der Aufbewahrung der Job-Logs
+import os
+import time
+
+from video_engine import LogBuffer, prune_logs
+
+
+def test_log_buffer_drain_empties_and_counts_dropped_lines():
+    buf = LogBuffer(maxlen=3)
+    for n in range(5):
+        buf.append(f"Zeile {n}")
+    assert buf.drain() == (["Zeile 2", "Zeile 3", "Zeile 4"], 2)
+    assert buf.drain() == ([], 0)
+    buf.append("neu")
+    assert buf.drain() == (["neu"], 0)
+
+def _log(folder, name, age_days):
+    path = folder / name
+    path.write_text("")
+    stamp = time.time() - age_days * 86400
+    os.utime(path, (stamp, stamp))
+    return path
+
+def test_prune_logs_keeps_newest_files_within_age(tmp_path):
+    logs = [_log(tmp_path, f"job{n}.log", age_days=n) for n in range(5)]
+    old = _log(tmp_path, "alt.log", age_days=30)
+    other = _log(tmp_path, "notiz.txt", age_days=30)
+    prune_logs(tmp_path, keep_files=3, keep_days=14)
+    assert [path.exists() for path in logs] == [True, True, True, False, False]
+    assert not old.exists() and other.exists()
+
+def test_prune_logs_without_folder(tmp_path):
+    prune_logs(tmp_path / "fehlt")
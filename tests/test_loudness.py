@@ -0,0 +1,24 @@
+# Tests der zweistufigen Lautheitsnormalisierung
+import video_probe
+from video_engine import build_ffmpeg_args, loudnorm_filter, make_settings
+
+MEASURED = {"I": -23.456, "TP": -4.2, "LRA": 14.25, "thresh": -33.9}
+
+
+def test_loudnorm_filter_single_pass_without_measurement():
+    assert loudnorm_filter(-16) == "loudnorm=I=-16:TP=-1.5:LRA=11"
+    assert loudnorm_filter(-16, {}) == "loudnorm=I=-16:TP=-1.5:LRA=11"
+
+def test_loudnorm_filter_linear_with_measurement():
+    assert loudnorm_filter(-16, MEASURED) == (
+        "loudnorm=I=-16:TP=-1.5:LRA=14.2"
+        ":measured_I=-23.46:measured_TP=-4.20:measured_LRA=14.25:measured_thresh=-33.90:linear=true"
+    )
+    # Die Ziel-LRA unterschreitet nie 11
+    assert ":LRA=11.0:" in loudnorm_filter(-16, dict(MEASURED, LRA=5.0))
+
+def test_encode_maps_the_measured_audio_stream(fake_source, tmp_path, monkeypatch):
+    monkeypatch.setattr(video_probe, "CACHE_DIR", tmp_path)
+    args = build_ffmpeg_args(make_settings({"hw_mode": "Software (CPU)"}), fake_source, "out.mp4")
+    maps = [args[i + 1] for i, arg in enumerate(args) if arg == "-map"]
+    assert maps == ["0:v:0", "0:a:0?"]
@@ -0,0 +1,51 @@
+# Tests des Ergebnis-Index (Wiedererkennen bereits kodierter Eingaben)
+import os
+
+import pytest
+
+import video_engine
+import video_probe
+from video_engine import lookup_output, make_settings, output_key, store_output
+
+
+@pytest.fixture
+def source(fake_source, tmp_path, monkeypatch):
+    monkeypatch.setattr(video_probe, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(video_engine, "OUTPUT_INDEX_DIR", tmp_path / "cache" / "outputs")
+    path = tmp_path / "quelle" / "film.mp4"
+    path.parent.mkdir()
+    path.write_bytes(b"\1" * 4096)
+    return path
+
+SETTINGS = make_settings({"hw_mode": "Software (CPU)"})
+
+def test_output_key_ignores_path_and_thread_budget(source, tmp_path):
+    key = output_key(SETTINGS, source)
+    moved = tmp_path / "verschoben.mp4"
+    os.link(source, moved)
+    assert output_key(SETTINGS, moved) == key
+    assert output_key(dict(SETTINGS, threads=4), source) == key
+
+def test_output_key_changes_with_settings_and_content(source):
+    key = output_key(SETTINGS, source)
+    assert output_key(dict(SETTINGS, quality_value="28"), source) != key
+    assert output_key(dict(SETTINGS, container="Matroska (.mkv)"), source) != key
+    assert output_key(dict(SETTINGS, smart_cut=True), source) != key
+    source.write_bytes(b"\2" * 4096)
+    assert output_key(SETTINGS, source) != key
+
+def test_output_key_without_source(tmp_path):
+    assert output_key(SETTINGS, tmp_path / "fehlt.mp4") is None
+
+def test_lookup_output_until_the_output_changes(source, tmp_path):
+    key = output_key(SETTINGS, source)
+    out_p = tmp_path / "film.mp4"
+    out_p.write_bytes(b"kodiert")
+    store_output(key, out_p, 93.25)
+    entry = lookup_output(key)
+    assert entry["output"] == str(out_p) and entry["seconds"] == 93.2
+    out_p.write_bytes(b"anders kodiert")
+    assert lookup_output(key) is None
+    out_p.unlink()
+    assert lookup_output(key) is None
+    assert lookup_output("0" * 40) is None
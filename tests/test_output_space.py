@@ -0,0 +1,88 @@
+# Tests für Zwischendateien, Aufräumen nach Abstürzen und die Platzreservierung
+import errno
+import os
+import subprocess
+from collections import namedtuple
+
+import pytest
+
+import video_engine
+from video_engine import BatchRunner, commit_output, make_settings, partial_path, remove_stale_work, work_dir
+
+Usage = namedtuple("Usage", "total used free")
+
+
+def _dead_pid():
+    proc = subprocess.Popen(["true"])
+    proc.wait()
+    return proc.pid
+
+def test_commit_output_copies_across_filesystems(tmp_path, monkeypatch):
+    staged, out_p = tmp_path / "scratch.mp4", tmp_path / "ziel" / "film.mp4"
+    out_p.parent.mkdir()
+    staged.write_bytes(b"video")
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if src == staged:
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(video_engine.os, "replace", replace)
+    commit_output(staged, out_p)
+    assert out_p.read_bytes() == b"video"
+    assert not staged.exists()
+    assert os.listdir(out_p.parent) == ["film.mp4"]
+
+def test_commit_output_other_errors_are_raised(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        commit_output(tmp_path / "fehlt.mp4", tmp_path / "film.mp4")
+
+def test_remove_stale_work_only_touches_dead_processes(tmp_path):
+    dead = _dead_pid()
+    own_dir = work_dir(tmp_path, "smartcut")
+    own_part = partial_path(tmp_path / "film.mp4")
+    own_part.write_bytes(b"")
+    stale = [tmp_path / f".{dead}-chunks-x1", tmp_path / f".{dead}-part-film.mkv"]
+    stale[0].mkdir()
+    stale[1].write_bytes(b"")
+    keep = [tmp_path / f".{dead}-urlaub.mp4", tmp_path / f"{dead}-urlaub.mp4"]
+    for path in keep:
+        path.write_bytes(b"")
+
+    remove_stale_work(tmp_path)
+    assert own_dir.exists() and own_part.exists()
+    assert not any(path.exists() for path in stale)
+    assert all(path.exists() for path in keep)
+
+def test_remove_stale_work_in_scratch_dir(tmp_path):
+    dead = _dead_pid()
+    stale, own = tmp_path / f"{dead}-0-film.mp4", tmp_path / f"{os.getpid()}-1-film.mp4"
+    stale.write_bytes(b"")
+    own.write_bytes(b"")
+    remove_stale_work(tmp_path, scratch=True)
+    assert not stale.exists() and own.exists()
+
+def test_reserve_space_counts_parallel_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_engine, "SPACE_RESERVE", 0)
+    monkeypatch.setattr(video_engine, "estimate_output_bytes", lambda settings, infile, dur: 400 << 20)
+    monkeypatch.setattr(video_engine.shutil, "disk_usage", lambda folder: Usage(0, 0, 1000 << 20))
+    runner = BatchRunner([], log_dir=None)
+    settings = make_settings({})
+    out_p = tmp_path / "film.mp4"
+    part_p = partial_path(out_p)
+
+    assert runner._reserve_space(0, settings, "a.mp4", out_p, part_p, 60, False) is None
+    assert runner._reserve_space(1, settings, "b.mp4", out_p, part_p, 60, False) is None
+    # Der dritte Job passt nicht mehr neben die beiden reservierten
+    assert "Zu wenig Speicherplatz" in runner._reserve_space(2, settings, "c.mp4", out_p, part_p, 60, False)
+    runner._release_space(0)
+    assert runner._reserve_space(2, settings, "c.mp4", out_p, part_p, 60, False) is None
+
+def test_reserve_space_doubles_for_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_engine, "SPACE_RESERVE", 0)
+    monkeypatch.setattr(video_engine, "estimate_output_bytes", lambda settings, infile, dur: 600 << 20)
+    monkeypatch.setattr(video_engine.shutil, "disk_usage", lambda folder: Usage(0, 0, 1000 << 20))
+    runner = BatchRunner([], log_dir=None)
+    out_p = tmp_path / "film.mp4"
+    assert runner._reserve_space(0, make_settings({}), "a.mp4", out_p, partial_path(out_p), 60, True)
@@ -0,0 +1,58 @@
+# Tests des Datei-Caches von video_probe
+import os
+import time
+
+import pytest
+
+import video_probe
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    monkeypatch.setattr(video_probe, "CACHE_DIR", path)
+    return path
+
+def _entry(path, size, age_days):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\0" * size)
+    stamp = time.time() - age_days * 86400
+    os.utime(path, (stamp, stamp))
+    return path
+
+def test_store_and_load_json_follow_the_file_state(cache_dir, tmp_path):
+    source = tmp_path / "film.mp4"
+    source.write_bytes(b"a")
+    video_probe.store_json(source, "probe", {"format": {}})
+    assert video_probe.load_json(source, "probe") == {"format": {}}
+    source.write_bytes(b"ab")
+    assert video_probe.load_json(source, "probe") is None
+
+def test_load_json_refreshes_old_entries(cache_dir, tmp_path):
+    source = tmp_path / "film.mp4"
+    source.write_bytes(b"a")
+    video_probe.store_json(source, "probe", {})
+    target = video_probe.cache_path(source, "probe")
+    stamp = time.time() - 10 * 86400
+    os.utime(target, (stamp, stamp))
+    assert video_probe.load_json(source, "probe") == {}
+    assert time.time() - target.stat().st_mtime < 60
+
+def test_prune_cache_drops_old_entries_then_oldest_over_limit(cache_dir):
+    old = _entry(cache_dir / "probe" / "alt.json", 10, age_days=90)
+    older = _entry(cache_dir / "sprites" / "a.jpg", 600, age_days=5)
+    newer = _entry(cache_dir / "keyframes" / "b.bin", 600, age_days=1)
+    presets = _entry(cache_dir / "presets.json", 10, age_days=90)
+    video_probe.prune_cache(keep_days=60, max_bytes=1000)
+    assert not old.exists() and not older.exists()
+    assert newer.exists() and presets.exists()
+
+def test_prune_cache_keeps_fresh_scratch_files_regardless_of_size(cache_dir):
+    fresh = _entry(cache_dir / "scratch" / "1-0-film.mp4", 2000, age_days=0)
+    stale = _entry(cache_dir / "scratch" / "2-0-film.mp4", 10, age_days=90)
+    video_probe.prune_cache(keep_days=60, max_bytes=1000)
+    assert fresh.exists() and not stale.exists()
+
+def test_prune_cache_without_cache_dir(cache_dir):
+    video_probe.prune_cache()
+    assert not cache_dir.exists()
@@ -0,0 +1,22 @@
+# Tests des Parsers für ffmpegs -progress-Ausgabe
+import io
+
+import pytest
+
+from video_engine import read_progress
+
+
+def test_read_progress_parses_blocks():
+    stream = io.StringIO(
+        "frame=10\nfps=25.0\nbitrate= 812.3kbits/s\ntotal_size=4096\nout_time_us=400000\nspeed=1.5x\nprogress=continue\n"
+        "fps=N/A\nout_time_us=N/A\nspeed=N/A\nprogress=end\n"
+    )
+    first, last = list(read_progress(stream))
+    assert first.out_time == pytest.approx(0.4)
+    assert first.fps == 25.0
+    assert first.speed == 1.5
+    assert first.bitrate_kbps == pytest.approx(812.3)
+    assert first.total_size == 4096
+    assert not first.done
+    assert last.out_time is None and last.fps is None and last.speed is None
+    assert last.done
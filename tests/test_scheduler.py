@@ -0,0 +1,34 @@
+# Tests der Kernverteilung zwischen parallelen Jobs
+from video_engine import CoreScheduler
+
+
+def _scheduler(workers, jobs, cores=16):
+    sched = CoreScheduler(workers, jobs)
+    sched.cores = list(range(cores))
+    sched._free = list(sched.cores)
+    return sched
+
+def test_core_scheduler_splits_and_hands_freed_cores_to_next_job():
+    sched = _scheduler(3, 5)
+    assert [sched.acquire(i) for i in range(3)] == [5, 5, 6]
+    sched.release(0)
+    assert sched.acquire(3) == 5
+    sched.release(1)
+    assert sched.acquire(4) == 5
+    # Kein Job wartet mehr: frei werdende Kerne gehen an die laufenden
+    sched.release(2)
+    assert sorted(len(c) for c in sched._assigned.values()) == [8, 8]
+    assert sorted(c for cores in sched._assigned.values() for c in cores) == list(range(16))
+
+def test_core_scheduler_last_job_gets_all_free_cores():
+    sched = _scheduler(4, 2)
+    assert sched.acquire(0) == 8
+    assert sched.acquire(1) == 8
+    sched.release(0)
+    sched.release(1)
+    assert sched._free == list(range(8, 16)) + list(range(8))
+
+def test_core_scheduler_more_jobs_than_cores():
+    sched = _scheduler(4, 4, cores=2)
+    budgets = [sched.acquire(i) for i in range(4)]
+    assert budgets == [1, 1, 1, 1]
@@ -0,0 +1,35 @@
+# Tests der Smart-Cut-Planung (Keyframes werden simuliert, ffmpeg läuft nicht)
+import video_probe
+from video_engine import BatchRunner, make_settings, smart_cut_plan
+
+
+def test_smart_cut_plan_splits_at_keyframes(fake_source):
+    settings = make_settings({"start": "11", "duration": "60", "smart_cut": True})
+    assert smart_cut_plan(settings, fake_source) == [(11, 1, False), (12, 58, True), (70, 1.0, False)]
+
+def test_smart_cut_plan_without_cut_or_too_short(fake_source):
+    assert smart_cut_plan(make_settings({}), fake_source) is None
+    assert smart_cut_plan(make_settings({"start": "11", "duration": "1.5"}), fake_source) is None
+
+def test_smart_cut_copy_part_ends_before_next_keyframe(fake_source, tmp_path, monkeypatch):
+    settings = make_settings({"start": "11", "duration": "60", "smart_cut": True, "keep_rotation": False})
+    runner = BatchRunner([], log_dir=None)
+    cmds = []
+    monkeypatch.setattr(runner, "_run_ffmpeg", lambda cmd, *args, **kwargs: cmds.append(cmd) or 0)
+    runner._run_smart_cut(smart_cut_plan(settings, fake_source), settings, fake_source, tmp_path / "out.mp4", 0, 0)
+    copy = next(cmd for cmd in cmds if "copy" in cmd and "concat" not in cmd)
+    assert copy[copy.index("-ss") + 1] == "12.001000"
+    # Der Keyframe bei 70 s gehört schon zum neu kodierten Ende
+    assert copy[copy.index("-t") + 1] == "57.999000"
+
+def test_smart_cut_keeps_edges_unrotated_and_copies_source_rotation(fake_source, tmp_path, monkeypatch):
+    stream = dict(video_probe.video_stream(fake_source), side_data_list=[{"side_data_type": "Display Matrix", "rotation": -90}])
+    monkeypatch.setattr(video_probe, "video_stream", lambda path: stream)
+    settings = make_settings({"start": "11", "duration": "60", "smart_cut": True, "keep_rotation": False})
+    runner = BatchRunner([], log_dir=None)
+    cmds = []
+    monkeypatch.setattr(runner, "_run_ffmpeg", lambda cmd, *args, **kwargs: cmds.append(cmd) or 0)
+    runner._run_smart_cut(smart_cut_plan(settings, fake_source), settings, fake_source, tmp_path / "out.mp4", 0, 0)
+    *parts, mux = cmds
+    assert all("-noautorotate" in cmd for cmd in parts)
+    assert mux[mux.index("-metadata:s:v:0") + 1] == "rotate=90"
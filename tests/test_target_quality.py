@@ -0,0 +1,17 @@
+# Tests der CRF-Interpolation im Modus Zielqualität
+import pytest
+
+from video_engine import interpolate_crf
+
+
+POINTS = [(20, 0.990), (27, 0.980), (34, 0.960)]
+
+@pytest.mark.parametrize("target, crf", [(0.99, 20), (0.985, 24), (0.98, 27), (0.97, 30)])
+def test_interpolate_crf_between_points(target, crf):
+    assert interpolate_crf(POINTS, target, 51) == crf
+
+def test_interpolate_crf_extrapolates_and_clamps():
+    assert interpolate_crf(POINTS, 0.995, 51) == 16
+    assert interpolate_crf(POINTS, 0.5, 51) == 51
+    assert interpolate_crf(POINTS, 1.2, 51) == 0
+    assert interpolate_crf([(30, 0.97)], 0.99, 51) == 30
@@ -0,0 +1,21 @@
+# Tests der Thread-Profile je Encoder
+from video_engine import thread_args
+
+
+def test_thread_args_vp9_tiles_follow_width_and_threads():
+    assert thread_args("libvpx-vp9", 8, 1920) == ["-row-mt", "1", "-tile-columns", "2", "-threads", "8"]
+    assert thread_args("libvpx-vp9", 32, 3840)[3] == "3"
+    # Zu schmal für zwei Kacheln à 256 Pixel bzw. nur ein Thread
+    assert thread_args("libvpx-vp9", 8, 480)[3] == "0"
+    assert thread_args("libvpx-vp9", 1, 3840)[3] == "0"
+
+def test_thread_args_x265_pools_and_frame_threads():
+    assert thread_args("libx265", 8, 1920) == ["-threads", "8", "-x265-params", "pools=8:frame-threads=3"]
+    assert thread_args("libx265", 8, 1280)[-1] == "pools=8:frame-threads=2"
+    assert thread_args("libx265", 32, 3840)[-1].endswith(":lookahead-threads=4")
+
+def test_thread_args_other_encoders():
+    assert thread_args("libx264", 0, 1920) == ["-threads", "1"]
+    assert thread_args("libsvtav1", 6, 1920) == ["-svtav1-params", "lp=6"]
+    assert thread_args("h264_nvenc", 8, 1920) == []
+    assert thread_args("hevc_vaapi", 8, 1920) == []
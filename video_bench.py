@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# =======================================================================
+# Titel:     GuideOS Videokonverter – Encoder-Benchmark (ohne Qt)
+# =======================================================================
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from video_engine import (
+    PRESETS, is_encoder_available, _codec_quality_args, thread_args, cpu_threads, measure_ffmpeg, cpu_model
+)
+
+RESULT_DIR = Path.home() / ".local" / "state" / "guideos-videokonverter" / "benchmarks"
+
+# Reproduzierbare lavfi-Quellen: Testbild, detailreiches Fraktal, Rauschen (fester Seed)
+SOURCES = {
+    "testsrc2": "testsrc2=size={w}x{h}:rate=25",
+    "mandelbrot": "mandelbrot=size={w}x{h}:rate=25",
+    "noise": "color=c=gray:size={w}x{h}:rate=25,noise=alls=40:allf=t+u:all_seed=4711",
+}
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "2160p": (3840, 2160)}
+ENCODERS = ["libx264", "libx265", "libvpx-vp9", "libsvtav1"]
+
+
+def ffmpeg_version():
+    try:
+        return subprocess.check_output(["ffmpeg", "-version"], text=True).splitlines()[0]
+    except (subprocess.SubprocessError, OSError, IndexError):
+        return "unbekannt"
+
+
+def run_case(source, resolution, encoder, preset, seconds, workdir):
+    """Ein Messlauf: lavfi-Quelle → Encoder mit denselben Parametern wie bei der Konvertierung."""
+    w, h = RESOLUTIONS[resolution]
+    out = Path(workdir) / f"{source}-{resolution}-{encoder}-{preset}.mkv"
+    cmd = [
+        "ffmpeg", "-hide_banner", "-v", "error",
+        "-f", "lavfi", "-i", SOURCES[source].format(w=w, h=h), "-t", str(seconds), "-an"
+    ] + _codec_quality_args(encoder, "CQ", "23", preset, None) + thread_args(encoder, cpu_threads(), w)
+    cmd += ["-pix_fmt", "yuv420p", "-y", str(out)]
+    stats = measure_ffmpeg(cmd)
+    size = out.stat().st_size if out.exists() else 0
+    out.unlink(missing_ok=True)
+    return {
+        "source": source, "resolution": resolution, "encoder": encoder, "preset": preset,
+        "ok": stats.returncode == 0,
+        "fps": stats.fps, "speed": stats.speed,
+        "wall_seconds": round(stats.wall_seconds, 3),
+        "cpu_seconds": round(stats.cpu_seconds, 3),
+        "max_rss_mb": round(stats.max_rss_kb / 1024, 1),
+        "bytes": size,
+    }
+
+
+def case_key(result):
+    return (result["source"], result["resolution"], result["encoder"], result["preset"])
+
+
+def compare(results, baseline, threshold):
+    """Vergleicht fps mit einem früheren Lauf; liefert die Anzahl der Verschlechterungen über `threshold` %."""
+    old = {case_key(r): r for r in baseline.get("results", [])}
+    regressions = 0
+    for r in results:
+        prev = old.get(case_key(r))
+        if not prev or not prev.get("fps") or not r.get("fps"):
+            continue
+        delta = (r["fps"] - prev["fps"]) / prev["fps"] * 100
+        mark = ""
+        if delta < -threshold:
+            regressions += 1
+            mark = "  ← langsamer"
+        print(f"{' / '.join(case_key(r)):<48} {prev['fps']:8.1f} → {r['fps']:8.1f} fps ({delta:+5.1f} %){mark}")
+    return regressions
+
+
+def build_arg_parser():
+    p = argparse.ArgumentParser(
+        prog="guideos-videokonverter --benchmark",
+        description="Misst Durchsatz der CPU-Encoder je Preset mit synthetischen Testquellen.",
+    )
+    p.add_argument("--sources", default=",".join(SOURCES), help="Komma-Liste aus " + ", ".join(SOURCES))
+    p.add_argument("--resolutions", default=",".join(RESOLUTIONS), help="Komma-Liste aus " + ", ".join(RESOLUTIONS))
+    p.add_argument("--encoders", default=",".join(ENCODERS))
+    p.add_argument("--presets", default=",".join(PRESETS))
+    p.add_argument("--seconds", type=float, default=5.0, help="Länge jeder Testquelle in Sekunden")
+    p.add_argument("--output", help="Ergebnisdatei (JSON)")
+    p.add_argument("--compare", help="früheres Ergebnis (JSON) zum Vergleich")
+    p.add_argument("--threshold", type=float, default=5.0, help="erlaubte fps-Verschlechterung in %%")
+    return p
+
+
+def main(argv=None):
+    opts = build_arg_parser().parse_args(argv)
+    sources = [s for s in opts.sources.split(",") if s in SOURCES]
+    resolutions = [r for r in opts.resolutions.split(",") if r in RESOLUTIONS]
+    presets = [p for p in opts.presets.split(",") if p in PRESETS]
+    encoders = []
+    for enc in opts.encoders.split(","):
+        if is_encoder_available(enc):
+            encoders.append(enc)
+        else:
+            print(f"{enc}: nicht verfügbar – übersprungen", file=sys.stderr)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="guideos-bench-") as workdir:
+        for source in sources:
+            for resolution in resolutions:
+                for encoder in encoders:
+                    # Presets, die zu identischen Argumenten führen (z. B. VP9 im CQ-Modus), nur einmal messen
+                    measured = {}
+                    for preset in presets:
+                        args = tuple(_codec_quality_args(encoder, "CQ", "23", preset, None))
+                        if args in measured:
+                            result = dict(measured[args], preset=preset)
+                        else:
+                            result = run_case(source, resolution, encoder, preset, opts.seconds, workdir)
+                            measured[args] = result
+                        results.append(result)
+                        fps = f"{result['fps']:.1f} fps" if result["fps"] else "–"
+                        print(f"{source:<10} {resolution:<6} {encoder:<11} {preset:<10} {fps:>10}  "
+                              f"{result['cpu_seconds']:7.1f} s CPU  {result['max_rss_mb']:7.1f} MB", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "cpu": cpu_model(), "cores": os.cpu_count(),
+            "ffmpeg": ffmpeg_version(), "seconds": opts.seconds,
+        },
+        "results": results,
+    }
+    out = Path(opts.output) if opts.output else RESULT_DIR / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Ergebnis: {out}", file=sys.stderr)
+
+    if opts.compare:
+        baseline = json.loads(Path(opts.compare).read_text())
+        regressions = compare(results, baseline, opts.threshold)
+        if regressions:
+            print(f"{regressions} Messung(en) mehr als {opts.threshold:g} % langsamer.", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
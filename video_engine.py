@@ -0,0 +1,2169 @@
+#!/usr/bin/env python3
+# =======================================================================
+# Titel:     GuideOS Videokonverter – Engine & Batch-CLI (ohne Qt)
+# =======================================================================
+import sys
+import os
+import shutil
+import subprocess
+import threading
+import queue
+import re
+import json
+import csv
+import errno
+import argparse
+import tempfile
+import hashlib
+import signal
+import time
+from collections import namedtuple, deque
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import video_probe
+from video_journal import Journal
+
+
+# -------------------- Hilfsfunktionen & Sicherheit --------------------
+def which_bin(name):
+    return shutil.which(name) is not None
+
+# PCI-Hersteller-IDs aus /sys/class/drm/*/device/vendor
+_PCI_VENDORS = {"0x10de": "NVIDIA", "0x1002": "AMD", "0x8086": "INTEL"}
+# Reihenfolge bei mehreren Karten: dedizierte vor integrierter GPU
+_GPU_PRIORITY = ("NVIDIA", "AMD", "INTEL")
+DRM_DIR = Path("/sys/class/drm")
+DEFAULT_RENDER_NODE = "/dev/dri/renderD128"
+
+_gpus = None
+_gpu_lock = threading.Lock()
+
+def scan_gpus(rescan=False):
+    """Grafikkarten direkt aus sysfs: {Hersteller: Render-Node oder None}; einmal je Prozess gelesen."""
+    global _gpus
+    with _gpu_lock:
+        if _gpus is None or rescan:
+            gpus = {}
+            try:
+                entries = sorted(DRM_DIR.iterdir())
+            except OSError:
+                entries = []
+            for entry in entries:
+                if not re.match(r"^(card|renderD)\d+$", entry.name):
+                    continue
+                try:
+                    vendor = _PCI_VENDORS.get((entry / "device" / "vendor").read_text().strip())
+                except OSError:
+                    continue
+                if not vendor:
+                    continue
+                node = f"/dev/dri/{entry.name}" if entry.name.startswith("renderD") else None
+                if gpus.get(vendor) is None:
+                    gpus[vendor] = node
+            _gpus = gpus
+        return _gpus
+
+def cpu_model():
+    """Modellname der CPU aus /proc/cpuinfo (für Benchmarks und Preset-Cache)."""
+    try:
+        for line in Path("/proc/cpuinfo").read_text().splitlines():
+            if line.startswith("model name"):
+                return line.partition(":")[2].strip()
+    except OSError:
+        pass
+    return "unbekannt"
+
+def detect_gpu_short():
+    """GPU-Hersteller (NVIDIA/AMD/INTEL) oder CPU – ohne Fremdprozess, aus dem sysfs-Scan."""
+    gpus = scan_gpus()
+    return next((v for v in _GPU_PRIORITY if v in gpus), "CPU")
+
+def render_node(vendor=None):
+    """Render-Node für VAAPI: der des gewünschten Herstellers, sonst der erste AMD/Intel-Node."""
+    gpus = scan_gpus()
+    if gpus.get(vendor):
+        return gpus[vendor]
+    return next((gpus[v] for v in ("AMD", "INTEL") if gpus.get(v)), DEFAULT_RENDER_NODE)
+
+def probe_duration_seconds(path: Path):
+    return video_probe.duration(path)
+
+def calculate_bitrate_for_target_size(filepath, target_size_mb, audio_bitrate_kbps=192):
+    dur = probe_duration_seconds(Path(filepath))
+    if not dur or dur <= 0: return None
+    total_kbps = (target_size_mb * 8192) / dur
+    video_kbps = max(total_kbps - audio_bitrate_kbps, 300)
+    return int(video_kbps)
+
+def make_unique_path(path: Path, taken=()) -> Path:
+    path = path.resolve()
+    if not path.exists() and path not in taken: return path
+    parent, stem, suffix = path.parent, path.stem, path.suffix
+    new_stem = f"{stem}_converted"
+    candidate = parent / f"{new_stem}{suffix}"
+    if not candidate.exists() and candidate not in taken: return candidate
+    i = 1
+    while True:
+        candidate = parent / f"{new_stem}({i}){suffix}"
+        if not candidate.exists() and candidate not in taken: return candidate
+        i += 1
+
+def partial_path(out_p: Path) -> Path:
+    """Temporärer Name im Zielordner; erst nach Erfolg wird atomar auf `out_p` umbenannt.
+
+    Das PID-Präfix erlaubt remove_stale_work, Reste abgestürzter Läufe zu erkennen.
+    """
+    return out_p.with_name(f".{os.getpid()}-part-{out_p.name}")
+
+def commit_output(staged: Path, out_p: Path):
+    """Bringt die fertige Datei atomar an ihren Zielnamen.
+
+    Liegt sie auf einem anderen Dateisystem (lokaler Zwischenordner), wird sie zunächst unter
+    temporärem Namen in den Zielordner kopiert und erst dort umbenannt.
+    """
+    try:
+        os.replace(staged, out_p)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    tmp = partial_path(out_p)
+    try:
+        shutil.copyfile(staged, tmp)
+        os.replace(tmp, out_p)
+    finally:
+        tmp.unlink(missing_ok=True)
+    staged.unlink(missing_ok=True)
+
+def default_job_count(codec):
+    """Parallele ffmpeg-Jobs: CPU-Encoder teilen sich die Kerne, GPU-Encoder haben begrenzte Sessions."""
+    if "nvenc" in codec or "vaapi" in codec:
+        return 2
+    return max(1, min(8, (os.cpu_count() or 1) // 4))
+
+def parse_seconds(time_str) -> float:
+    """Sekunden aus HH:MM:SS, MM:SS oder SS(.ms), auch mit Dezimalkomma; ValueError bei anderem Format."""
+    text = str(time_str).strip().replace(",", ".")
+    if not re.match(r"^(\d+:){0,2}\d+(\.\d+)?$", text):
+        raise ValueError(f"Ungültige Zeitangabe: {time_str!r}")
+    return sum(float(part) * 60 ** i for i, part in enumerate(reversed(text.split(":"))))
+
+def sanitize_int(val_str: str, default: int = 0) -> int:
+    """Extrahiert sicher Ganzzahlen aus Benutzereingaben."""
+    try:
+        return abs(int(re.sub(r"[^\d]", "", val_str)))
+    except ValueError:
+        return default
+
+# -------------------- Encoder-Fähigkeiten --------------------
+# Einmal je ffmpeg-Binär ermittelt (-encoders, -hwaccels) und im Cache abgelegt; jeder Encoder
+# wird vor der ersten Verwendung mit einem Mini-Testlauf geprüft, ob er hier wirklich läuft.
+# Gespeichert werden nur gelungene Scans und Tests; Fehlschläge (z. B. alle NVENC-Sessions
+# belegt) gelten nur für den laufenden Prozess.
+VALIDATE_ENCODERS = True
+
+_capabilities = None
+_caps_lock = threading.Lock()
+_failed_tests = set()
+
+def _ffmpeg_output(*args):
+    return subprocess.check_output(["ffmpeg", "-hide_banner"] + list(args), stderr=subprocess.DEVNULL, text=True)
+
+def _scan_capabilities():
+    """Liest Encoder (Name → Typ V/A/S), Hardware-Beschleuniger und Filter aus einem Aufruf je Liste.
+
+    Liefert (Tabelle, vollständig); eine unvollständige Tabelle darf nicht in den Cache.
+    """
+    encoders, hwaccels, filters = {}, [], []
+    complete = False
+    try:
+        listing = _ffmpeg_output("-encoders").split("------", 1)[-1]
+        for line in listing.splitlines():
+            parts = line.split()
+            if len(parts) >= 2 and len(parts[0]) == 6:
+                encoders[parts[1]] = parts[0][0]
+        hwaccels = [l.strip() for l in _ffmpeg_output("-hwaccels").splitlines()[1:] if l.strip()]
+        for line in _ffmpeg_output("-filters").splitlines():
+            parts = line.split()
+            if len(parts) >= 3 and "->" in parts[2]:
+                filters.append(parts[1])
+        complete = bool(encoders)
+    except (subprocess.SubprocessError, OSError):
+        pass
+    return {"encoders": encoders, "hwaccels": hwaccels, "filters": filters, "usable": {}}, complete
+
+def capabilities():
+    """Fähigkeitstabelle des installierten ffmpeg; pro Binärstand (Pfad, Größe, mtime) nur einmal ermittelt."""
+    global _capabilities
+    with _caps_lock:
+        if _capabilities is None:
+            binary = shutil.which("ffmpeg")
+            if not binary:
+                return {"encoders": {}, "hwaccels": [], "filters": [], "usable": {}}
+            _capabilities = video_probe.load_json(binary, "capabilities")
+            # Ältere Tabellen ohne Filterliste neu aufbauen
+            if _capabilities is None or "filters" not in _capabilities:
+                _capabilities, complete = _scan_capabilities()
+                if complete:
+                    video_probe.store_json(binary, "capabilities", _capabilities)
+        return _capabilities
+
+def _test_encode(encoder):
+    """Kodiert ein einzelnes lavfi-Testbild; schlägt fehl, wenn Treiber oder Hardware fehlen."""
+    cmd = ["ffmpeg", "-hide_banner", "-v", "error"]
+    vf = []
+    if "vaapi" in encoder:
+        cmd += ["-vaapi_device", render_node()]
+        vf = ["-vf", "format=nv12,hwupload"]
+    cmd += ["-f", "lavfi", "-i", "color=c=black:s=256x144:r=25:d=0.2"] + vf
+    cmd += ["-frames:v", "1", "-c:v", encoder, "-f", "null", "-"]
+    try:
+        return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=20).returncode == 0
+    except (subprocess.SubprocessError, OSError):
+        return False
+
+def is_encoder_available(encoder: str) -> bool:
+    caps = capabilities()
+    if encoder not in caps["encoders"]:
+        return False
+    if not VALIDATE_ENCODERS or caps["encoders"][encoder] != "V":
+        return True
+    with _caps_lock:
+        if caps["usable"].get(encoder):
+            return True
+        if encoder in _failed_tests:
+            return False
+    usable = _test_encode(encoder)
+    with _caps_lock:
+        if not usable:
+            # Nur für diesen Prozess merken: beim nächsten Start wird erneut geprüft
+            _failed_tests.add(encoder)
+            return False
+        caps["usable"][encoder] = True
+        binary = shutil.which("ffmpeg")
+        if binary:
+            video_probe.store_json(binary, "capabilities", caps)
+    return True
+
+def rescan_hardware():
+    """Nach dem Ein-/Ausstecken einer GPU: sysfs neu lesen und Testkodierungen verwerfen."""
+    scan_gpus(rescan=True)
+    caps = capabilities()
+    with _caps_lock:
+        caps["usable"].clear()
+        _failed_tests.clear()
+        binary = shutil.which("ffmpeg")
+        if binary:
+            video_probe.store_json(binary, "capabilities", caps)
+    return detect_gpu_short()
+
+def has_hwaccel(name):
+    return name in capabilities()["hwaccels"]
+
+def has_filter(name):
+    return name in capabilities()["filters"]
+
+_ENCODER_MAP = {
+    "H.264": {"NVIDIA": ["h264_nvenc"], "AMD": ["h264_vaapi"], "INTEL": ["h264_vaapi"], "CPU": ["libx264"]},
+    "H.265": {"NVIDIA": ["hevc_nvenc"], "AMD": ["hevc_vaapi"], "INTEL": ["hevc_vaapi"], "CPU": ["libx265"]},
+    "VP9":   {"NVIDIA": [], "AMD": ["vp9_vaapi"], "INTEL": ["vp9_vaapi"], "CPU": ["libvpx-vp9"]},
+    "AV1":   {"NVIDIA": ["av1_nvenc"], "AMD": ["av1_vaapi"], "INTEL": ["av1_vaapi"], "CPU": ["libsvtav1"]},
+}
+
+def warm_up_encoders():
+    """Prüft alle in Frage kommenden Encoder vorab (für einen Hintergrund-Thread beim Programmstart)."""
+    for modes in _ENCODER_MAP.values():
+        for candidates in modes.values():
+            for enc in candidates:
+                is_encoder_available(enc)
+
+def _select_encoder(fmt, mode):
+    candidates = _ENCODER_MAP.get(fmt, {}).get(mode, [])
+    for enc in candidates:
+        if is_encoder_available(enc): return enc
+    return {"H.264":"libx264", "H.265":"libx265", "VP9":"libvpx-vp9", "AV1":"libsvtav1"}.get(fmt, "libx264")
+
+def _codec_quality_args(codec, qmode, qval_raw, preset, infile):
+    args = ["-c:v", codec]
+    if "Zielqualität" in qmode:
+        # Ohne vorherige CRF-Suche (z. B. bei Probekodierungen) mit dem Standardwert
+        qmode, qval_raw = "CQ", "23"
+
+    if "nvenc" in codec:
+        p_map = {"ultrafast":"p1","superfast":"p2","veryfast":"p3","faster":"p4","fast":"p5","medium":"p6","slow":"p7"}
+        p = p_map.get(preset, "p4")
+    elif "libsvtav1" in codec:
+        svt_map = {
+            "ultrafast": "12", "superfast": "11", "veryfast": "10",
+            "faster": "8", "fast": "7", "medium": "6",
+            "slow": "4", "slower": "3", "veryslow": "2"
+        }
+        p = svt_map.get(preset, "6")
+    else:
+        p = preset
+
+    if "CQ" in qmode:
+        qn = str(sanitize_int(qval_raw, default=23))
+        if "nvenc" in codec: args += ["-rc", "vbr", "-cq", qn, "-preset", p]
+        elif "vaapi" in codec: args += ["-rc_mode", "CQP", "-qp", qn]
+        elif "libvpx-vp9" in codec: args += ["-crf", qn, "-b:v", "0"]
+        else: args += ["-crf", qn, "-preset", p]
+    elif "Bitrate" in qmode:
+        kbps = str(sanitize_int(qval_raw, default=5000))
+        args += ["-b:v", f"{kbps}k"]
+        if "libvpx-vp9" not in codec: args += ["-preset", p]
+    else:
+        target_mb = sanitize_int(qval_raw, default=700)
+        vkbps = calculate_bitrate_for_target_size(infile, target_mb) or 5000
+        args += ["-b:v", f"{vkbps}k"]
+        if "libvpx-vp9" not in codec: args += ["-preset", p]
+    return args
+
+
+# Preset-Auswahl der Oberfläche (x264/x265-Namen; für NVENC und SVT-AV1 umgesetzt)
+PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow"]
+# Automatische Wahl nach Geschwindigkeitsziel (siehe choose_preset)
+AUTO_PRESETS = [f"Auto (Ziel: {n}× Echtzeit)" for n in (1, 2, 4)]
+
+
+# -------------------- Thread-Profile --------------------
+def cpu_threads():
+    """Für diesen Prozess nutzbare Kerne (berücksichtigt eine gesetzte CPU-Affinität)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+def thread_args(codec, threads, width=1920):
+    """Parallelisierung je Software-Encoder für ein Budget von `threads` Kernen.
+
+    Ohne diese Angaben nutzt libvpx-vp9 nur wenige Kerne, während x265 und SVT-AV1
+    davon ausgehen, die ganze Maschine zu besitzen – bei parallelen Jobs überbucht das die CPU.
+    """
+    threads = max(1, int(threads))
+    if codec == "libx264":
+        return ["-threads", str(threads)]
+    if codec == "libx265":
+        # Frame-Threads nach Kernzahl; wenige CTU-Zeilen (kleine Auflösung) lohnen weniger
+        frame_threads = 1 if threads < 4 else 2 if threads < 8 else 3 if threads < 16 else 4
+        if width <= 1280:
+            frame_threads = min(frame_threads, 2)
+        params = f"pools={threads}:frame-threads={frame_threads}"
+        if threads >= 16:
+            params += f":lookahead-threads={min(8, threads // 8)}"
+        return ["-threads", str(threads), "-x265-params", params]
+    if codec == "libvpx-vp9":
+        # Kachelspalten sind mindestens 256 Pixel breit; mehr Spalten als Threads bringen nichts
+        tiles = 0
+        while tiles < 6 and (width >> (tiles + 1)) >= 256 and (2 << tiles) <= threads:
+            tiles += 1
+        return ["-row-mt", "1", "-tile-columns", str(tiles), "-threads", str(threads)]
+    if codec == "libsvtav1":
+        return ["-svtav1-params", f"lp={threads}"]
+    # Hardware-Encoder: die Arbeit erledigt die GPU
+    return []
+
+def job_threads(settings):
+    """Thread-Budget eines Jobs; 0 (automatisch) bedeutet alle Kerne."""
+    return sanitize_int(str(settings.get("threads", 0)), default=0) or cpu_threads()
+
+
+# -------------------- Einstellungen --------------------
+# Die Werte entsprechen den Texten der GUI-Auswahlfelder; ausgewertet wird
+# per Teilstring, daher genügen auf der Kommandozeile Kurzformen wie "CQ".
+DEFAULT_SETTINGS = {
+    "hw_mode": "Automatisch",
+    "container": "MP4 (.mp4)",
+    "video": "H.264",
+    "audio": "AAC",
+    "audio_copy": False,
+    "lufs": -16,
+    "quality_mode": "CQ (Qualitätsbasiert)",
+    "quality_value": "23",
+    "preset": "medium",
+    "dimension": "Original",
+    "sharpen": "Aus",
+    "bit_depth": "8-Bit (Standard)",
+    "keep_rotation": True,
+    "start": "00:00:00",
+    "duration": "0",
+    "smart_cut": False,
+    "chunked": False,
+    "output_dir": "",
+    "save_in_source": False,
+    "reuse": "Überspringen",
+    # Thread-Budget je Job (0 = automatisch, der Stapel teilt die Kerne auf)
+    "threads": 0,
+}
+
+_BOOL_SETTINGS = {k for k, v in DEFAULT_SETTINGS.items() if isinstance(v, bool)}
+
+def make_settings(overrides=None):
+    """Ergänzt (z.B. aus einem Manifest stammende) Teil-Einstellungen um die Standardwerte."""
+    settings = dict(DEFAULT_SETTINGS)
+    for key, val in (overrides or {}).items():
+        if key not in DEFAULT_SETTINGS or val is None or val == "":
+            continue
+        if key in _BOOL_SETTINGS and isinstance(val, str):
+            val = val.strip().lower() in ("1", "true", "ja", "yes", "x")
+        elif key in ("lufs", "threads"):
+            val = int(val)
+        settings[key] = val
+    return settings
+
+def resolve_hw_mode(sel_text):
+    sel = (sel_text or "").upper()
+    if "NVIDIA" in sel: return "NVIDIA"
+    if "AMD" in sel: return "AMD"
+    if "INTEL" in sel: return "INTEL"
+    if "SOFTWARE" in sel or "CPU" in sel: return "CPU"
+    return detect_gpu_short().upper()
+
+def video_format(vchoice):
+    return next((f for f in ("H.264", "H.265", "VP9", "AV1") if f in vchoice), "AV1")
+
+def output_extension(settings):
+    container_choice = settings["container"]
+    if "WebM" in container_choice:
+        return ".webm"
+    if "FLAC" in settings["audio"]:
+        return ".mkv"
+    if "MP4" in container_choice:
+        return ".mp4"
+    return ".mkv"
+
+def output_dir_for(in_p: Path, settings):
+    if settings["save_in_source"]:
+        return in_p.parent
+    if settings["output_dir"].strip():
+        return Path(settings["output_dir"].strip()).resolve()
+    return in_p.parent / "converted"
+
+def job_encoder(settings):
+    """Video-Encoder eines Jobs; WebM erzwingt VP9, sofern nicht VP9/AV1 gewählt ist."""
+    vchoice = settings["video"]
+    if "WebM" in settings["container"] and vchoice not in ["VP9", "AV1"]:
+        vchoice = "VP9"
+    return _select_encoder(video_format(vchoice), resolve_hw_mode(settings["hw_mode"]))
+
+def job_count(settings, requested=0):
+    """Anzahl paralleler Jobs; 0 bedeutet automatische Wahl passend zum Encoder."""
+    if requested > 0:
+        return requested
+    if settings["video"] == "Nur Audio ändern":
+        return default_job_count("")
+    return default_job_count(job_encoder(settings))
+
+def loudnorm_filter(target_lufs, measured=None):
+    """loudnorm im linearen Modus mit Messwerten aus dem Messdurchlauf, sonst einstufig (dynamisch)."""
+    if not measured:
+        return f"loudnorm=I={target_lufs}:TP=-1.5:LRA=11"
+    # Linear geht nur, wenn die Ziel-LRA die gemessene nicht unterschreitet
+    lra = max(11.0, measured["LRA"])
+    return (
+        f"loudnorm=I={target_lufs}:TP=-1.5:LRA={lra:.1f}"
+        f":measured_I={measured['I']:.2f}:measured_TP={measured['TP']:.2f}"
+        f":measured_LRA={measured['LRA']:.2f}:measured_thresh={measured['thresh']:.2f}:linear=true"
+    )
+
+def needs_loudness(settings):
+    """True, wenn die Tonspur neu kodiert (und damit normalisiert) wird."""
+    return not (settings["audio_copy"] and "WebM" not in settings["container"])
+
+def audio_args(settings, infile=None):
+    """Audio-Codec und -Filter gemäß Einstellungen (auch für den Smart-Cut-Mux genutzt).
+
+    Mit `infile` wird zweistufig normalisiert, sofern die Messung (BatchRunner._measure_loudness)
+    bereits im Cache liegt; hier selbst wird nie gemessen.
+    """
+    is_webm = "WebM" in settings["container"]
+    vchoice, achoice = settings["video"], settings["audio"]
+    audio_copy = settings["audio_copy"] and not is_webm
+    target_lufs = int(settings["lufs"])
+    if is_webm and vchoice not in ["VP9", "AV1"]:
+        vchoice = "VP9"
+
+    args = []
+    if audio_copy:
+        args += ["-c:a", "copy"]
+    else:
+        a_codec_map = {
+            "Opus (WebM/MKV)": "libopus",
+            "AAC": "aac",
+            "PCM": "pcm_s16le",
+            "FLAC (mkv)": "flac"
+        }
+        if is_webm:
+            a_codec = "libopus"
+        else:
+            a_codec = a_codec_map.get(achoice, "aac")
+
+        args += ["-c:a", a_codec]
+
+        audio_filters = []
+        if achoice == "PCM" or vchoice in ["AV1", "VP9"] or is_webm:
+            args += ["-ar", "48000"]
+            audio_filters.append("aresample=48000")
+
+        measured = video_probe.loudness(infile, *cut_range(settings), measure=False) if infile else None
+        audio_filters.append(loudnorm_filter(target_lufs, measured))
+        args += ["-af", ",".join(audio_filters)]
+
+    return args
+
+def video_args(settings, infile):
+    """Video-Encoder, Qualität, Pixelformat und Filterkette (auch für das Chunk-Kodieren genutzt)."""
+    qmode, qval_raw = settings["quality_mode"], str(settings["quality_value"])
+    upscale = settings["dimension"]
+    sharpen_mode = settings["sharpen"]
+    preset = settings["preset"]
+    is_10bit = "10-Bit" in settings["bit_depth"]
+
+    # Schärfe-Parameter
+    unsharp_val = None
+    if "Leicht" in sharpen_mode:
+        unsharp_val = "3:3:0.4:3:3:0.0"
+    elif "Mittel" in sharpen_mode:
+        unsharp_val = "5:5:0.8:5:5:0.0"
+    elif "Stark" in sharpen_mode:
+        unsharp_val = "7:7:1.2:7:7:0.0"
+
+    codec = job_encoder(settings)
+    args = _codec_quality_args(codec, qmode, qval_raw, preset, infile)
+
+    if is_10bit and "vaapi" not in codec and "nvenc" not in codec:
+        args += ["-pix_fmt", "yuv420p10le"]
+    elif not is_10bit and "vaapi" not in codec and "nvenc" not in codec:
+        args += ["-pix_fmt", "yuv420p"]
+
+    res_map = {"720p": "1280", "1080p": "1920", "1440p": "2560", "2160p": "3840"}
+    target_w = next((v for k, v in res_map.items() if k in upscale), None)
+    out_w = int(target_w) if target_w else int((video_probe.video_stream(infile) or {}).get("width") or 1920)
+    args += thread_args(codec, job_threads(settings), out_w)
+
+    # --- Videofilter-Erstellung ---
+    vf_filters = []
+    if "nvenc" in codec:
+        if target_w:
+            vf_filters.append(f"scale={target_w}:-2:flags=lanczos")
+        if unsharp_val:
+            vf_filters.append(f"unsharp={unsharp_val}")
+    elif "vaapi" in codec:
+        vfmt = "p010le" if is_10bit else "nv12"
+        if unsharp_val:
+            if target_w:
+                vf_filters.append(f"scale_vaapi={target_w}:-2")
+            vf_filters.append(f"hwdownload,format={vfmt}")
+            vf_filters.append(f"unsharp={unsharp_val}")
+            vf_filters.append(f"format={vfmt},hwupload")
+        else:
+            if target_w:
+                vf_filters.append(f"scale_vaapi={target_w}:-2,format=vaapi|{vfmt}")
+            else:
+                vf_filters.append(f"format=vaapi|{vfmt}")
+    else:
+        if target_w:
+            vf_filters.append(f"scale={target_w}:-2:flags=lanczos")
+        if unsharp_val:
+            vf_filters.append(f"unsharp={unsharp_val}")
+    if vf_filters:
+        args += ["-vf", ",".join(vf_filters)]
+    return args
+
+def build_ffmpeg_args(settings, infile, outfile, with_audio=True):
+    keep_rotation = settings["keep_rotation"]
+    hw_mode = resolve_hw_mode(settings["hw_mode"])
+    vchoice = settings["video"]
+
+    args = []
+
+    if keep_rotation:
+        args += ["-noautorotate"]
+
+    # Hardware-Decoder-Optionen
+    if vchoice != "Nur Audio ändern" and hw_mode != "CPU":
+        if "NVIDIA" in hw_mode:
+            # Nutze -hwaccel cuda ohne erzwungenes output_format cuda,
+            # damit FFmpeg bei Bedarf automatisch zwischen GPU und CPU konvertiert
+            if has_hwaccel("cuda"):
+                args += ["-hwaccel", "cuda"]
+        elif "INTEL" in hw_mode or "AMD" in hw_mode:
+            args += ["-hwaccel", "vaapi", "-hwaccel_output_format", "vaapi", "-hwaccel_device", render_node(hw_mode)]
+
+    start, dur = cut_range(settings)
+    if start > 0:
+        args += ["-ss", f"{start:.3f}"]
+
+    args += ["-i", str(Path(infile).resolve())]
+
+    if dur > 0:
+        args += ["-t", f"{dur:.3f}"]
+    # Dieselbe Tonspur wie bei der Lautheitsmessung (video_probe.loudness), nicht ffmpegs Wahl nach Kanalzahl
+    args += ["-map", "0:v:0"] + (["-map", "0:a:0?"] if with_audio else [])
+
+    if vchoice == "Nur Audio ändern":
+        args += ["-c:v", "copy"]
+    else:
+        args += video_args(settings, infile)
+
+    if keep_rotation:
+        args += ["-metadata:s:v:0", "rotate=90"]
+
+    if with_audio:
+        args += audio_args(settings, infile)
+    return args
+
+
+# -------------------- Auto-Preset --------------------
+# Gemessene Echtzeitfaktoren je (Encoder, Auflösung, CPU-Modell) und Preset
+PRESET_CACHE = video_probe.CACHE_DIR / "presets.json"
+AUTO_PRESET_SAMPLE_SECONDS = 4.0
+# So oft wird eine zwischendurch angehaltene Probe höchstens wiederholt
+AUTO_PRESET_SAMPLE_RETRIES = 3
+
+def auto_preset_target(preset):
+    """Geschwindigkeitsziel aus "Auto (Ziel: N× Echtzeit)", sonst None."""
+    m = re.match(r"^Auto \(Ziel: ([\d.,]+)×", str(preset))
+    return float(m.group(1).replace(",", ".")) if m else None
+
+def _preset_cache_key(codec, settings, infile):
+    res = next((r for r in ("720p", "1080p", "1440p", "2160p") if r in settings["dimension"]), None)
+    if not res:
+        stream = video_probe.video_stream(infile) or {}
+        res = f"{stream.get('height', '?')}p"
+    return f"{codec}|{res}|{cpu_model()}"
+
+def distinct_presets(codec):
+    """PRESETS ohne Einträge, die für `codec` dieselben Parameter ergeben wie ein schnelleres Preset.
+
+    NVENC kennt z. B. nur p1–p7; "slower"/"veryslow" fielen sonst auf p4 zurück und würden von der
+    Binärsuche als langsamste (vermeintlich beste) Stufe gewählt.
+    """
+    seen, result = set(), []
+    for preset in PRESETS:
+        args = tuple(_codec_quality_args(codec, "CQ", "23", preset, None))
+        if args not in seen:
+            seen.add(args)
+            result.append(preset)
+    return result
+
+def sample_speed(settings, infile, preset, measure=None):
+    """Echtzeitfaktor einer kurzen Probekodierung (ab einem Drittel der Datei, ohne Ausgabe)."""
+    start = (video_probe.duration(infile) or 0.0) / 3
+    cmd = ["ffmpeg", "-hide_banner", "-v", "error"]
+    if start > AUTO_PRESET_SAMPLE_SECONDS:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", str(infile), "-t", str(AUTO_PRESET_SAMPLE_SECONDS), "-an", "-sn"]
+    cmd += video_args(dict(settings, preset=preset), infile) + ["-f", "null", "-"]
+    stats = (measure or measure_ffmpeg)(cmd)
+    return stats.speed if stats and stats.returncode == 0 else None
+
+def choose_preset(settings, infile, target, measure=None):
+    """Langsamstes Preset, das noch `target`-fache Echtzeit schafft.
+
+    Binärsuche über die für den Encoder unterscheidbaren Presets (schnell → langsam); jede
+    gelungene Probe wird im Cache abgelegt, spätere Stapel auf derselben Maschine kommen meist
+    ganz ohne Probekodierung aus. `measure` ersetzt measure_ffmpeg (der Stapel führt die Proben
+    so abbrechbar und pausierbar aus) und liefert None für Proben, deren Tempo nicht zählt.
+    Liefert (Preset, gemessener Faktor oder None).
+    """
+    codec = job_encoder(settings)
+    presets = distinct_presets(codec)
+    if len(presets) == 1:
+        # Preset ohne Wirkung (VAAPI, libvpx-vp9)
+        return "medium", None
+
+    try:
+        cache = json.loads(PRESET_CACHE.read_text())
+    except (OSError, ValueError):
+        cache = {}
+    key = _preset_cache_key(codec, settings, infile)
+    speeds = cache.setdefault(key, {})
+    # Fehlgeschlagene bzw. abgebrochene Proben nur für diesen Lauf merken, nicht im Cache
+    failed = set()
+
+    best, lo, hi = presets[0], 0, len(presets) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        preset = presets[mid]
+        if preset not in speeds and preset not in failed:
+            speed = sample_speed(settings, infile, preset, measure)
+            if speed is None:
+                failed.add(preset)
+            else:
+                speeds[preset] = speed
+        if (speeds.get(preset) or 0.0) >= target:
+            best, lo = preset, mid + 1
+        else:
+            hi = mid - 1
+
+    try:
+        PRESET_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = PRESET_CACHE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache, indent=1))
+        os.replace(tmp, PRESET_CACHE)
+    except OSError:
+        pass
+    return best, speeds.get(best)
+
+
+# -------------------- Zielqualität --------------------
+# Probe-Segmente je Datei und CRF-Stützstellen (auf der 0–51- bzw. 0–63-Skala des Encoders)
+QUALITY_SAMPLES = 3
+QUALITY_SAMPLE_SECONDS = 3.0
+_CRF_PROBES = {51: (20, 27, 34), 63: (26, 36, 46)}
+DEFAULT_SSIM_TARGET = 0.98
+
+def quality_metric(qmode):
+    """"ssim" bzw. "vmaf" für den Modus Zielqualität, sonst None; VMAF nur mit libvmaf im ffmpeg."""
+    if "Zielqualität" not in qmode:
+        return None
+    return "vmaf" if "VMAF" in qmode and has_filter("libvmaf") else "ssim"
+
+def _crf_max(codec):
+    return 63 if codec in ("libvpx-vp9", "libsvtav1") else 51
+
+def _sample_ranges(settings, infile):
+    """Gleichmäßig über den Kodierbereich verteilte (Start, Länge)-Segmente."""
+    start, dur = cut_range(settings)
+    end = start + dur if dur > 0 else (video_probe.duration(infile) or 0.0)
+    span = end - start
+    if span <= QUALITY_SAMPLE_SECONDS:
+        return [(start, max(span, 0.1))]
+    count = max(1, min(QUALITY_SAMPLES, int(span // QUALITY_SAMPLE_SECONDS)))
+    return [
+        (start + (i + 1) * span / (count + 1) - QUALITY_SAMPLE_SECONDS / 2, QUALITY_SAMPLE_SECONDS)
+        for i in range(count)
+    ]
+
+def _score_sample(settings, infile, start, length, crf, metric, workdir, register):
+    """Kodiert ein Segment mit `crf` und vergleicht es mit der Quelle (SSIM „All“ bzw. VMAF-Score)."""
+    sample = Path(workdir) / f"s{start:.0f}-q{crf}.mkv"
+    sample_settings = dict(
+        settings, start=f"{start:.3f}", duration=f"{length:.3f}", keep_rotation=False,
+        quality_mode="CQ (Qualitätsbasiert)", quality_value=str(crf)
+    )
+    cmd = ["ffmpeg", "-hide_banner", "-v", "error"] + build_ffmpeg_args(sample_settings, infile, str(sample), with_audio=False)
+    cmd += ["-an", "-sn", "-y", str(sample)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    register(proc)
+    if proc.wait() != 0:
+        return None
+
+    compare = "libvmaf" if metric == "vmaf" else "ssim"
+    graph = (
+        "[0:v]format=yuv420p,setpts=PTS-STARTPTS[d0];[1:v]format=yuv420p,setpts=PTS-STARTPTS[r0];"
+        f"[r0][d0]scale2ref=flags=bicubic[r][d];[d][r]{compare}"
+    )
+    cmd = [
+        "ffmpeg", "-hide_banner", "-nostats", "-i", str(sample),
+        "-ss", f"{start:.3f}", "-t", f"{length:.3f}", "-i", str(Path(infile).resolve()),
+        "-lavfi", graph, "-f", "null", "-"
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    register(proc)
+    _, err = proc.communicate()
+    sample.unlink(missing_ok=True)
+    pattern = r"VMAF score[:=]\s*([\d.]+)" if metric == "vmaf" else r"All:([\d.]+)"
+    found = re.findall(pattern, err)
+    return float(found[-1]) if proc.returncode == 0 and found else None
+
+def interpolate_crf(points, target, crf_max):
+    """Höchster CRF, der `target` noch erreicht – linear zwischen den Stützstellen (Score fällt mit dem CRF)."""
+    pts = sorted(points)
+    if len(pts) == 1:
+        return pts[0][0]
+    segments = list(zip(pts, pts[1:]))
+    # Passendes Intervall, sonst mit der Steigung des nächstgelegenen Randstücks extrapolieren
+    (c1, s1), (c2, s2) = next(
+        (seg for seg in segments if seg[0][1] >= target >= seg[1][1]),
+        segments[0] if target > pts[0][1] else segments[-1]
+    )
+    if s1 == s2:
+        crf = c2 if target <= s2 else c1
+    else:
+        crf = c1 + (s1 - target) * (c2 - c1) / (s1 - s2)
+    return int(max(0, min(crf_max, round(crf))))
+
+def find_crf(settings, infile, target, metric, workers=2, register=None):
+    """CRF für die Zielqualität: Probe-Segmente bei wenigen CRF-Werten parallel kodieren und messen.
+
+    Liefert (CRF, [(CRF, mittlerer Score), ...]) oder (None, []), wenn keine Messung gelang.
+    Das Ergebnis wird je Datei und Einstellungen im Cache abgelegt.
+    """
+    codec = job_encoder(settings)
+    extra = "|".join(map(str, (
+        codec, metric, target, settings["preset"], settings["dimension"], settings["sharpen"],
+        settings["bit_depth"], *cut_range(settings)
+    )))
+    cached = video_probe.load_json(infile, "crf", extra=extra)
+    if cached:
+        return cached["crf"], [tuple(p) for p in cached["points"]]
+
+    crf_max = _crf_max(codec)
+    ranges = _sample_ranges(settings, infile)
+    probes = _CRF_PROBES[crf_max]
+    register = register or (lambda proc: None)
+    # Die parallelen Probekodierungen teilen sich das Thread-Budget des Jobs
+    settings = dict(settings, threads=max(1, job_threads(settings) // max(1, workers)))
+    work = tempfile.mkdtemp(prefix="guideos-crf-")
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {
+                (crf, start): pool.submit(_score_sample, settings, infile, start, length, crf, metric, work, register)
+                for crf in probes for start, length in ranges
+            }
+        scores = {}
+        for (crf, _), fut in futures.items():
+            if fut.result() is not None:
+                scores.setdefault(crf, []).append(fut.result())
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    points = [(crf, sum(vals) / len(vals)) for crf, vals in sorted(scores.items())]
+    if not points:
+        return None, []
+    crf = interpolate_crf(points, target, crf_max)
+    video_probe.store_json(infile, "crf", {"crf": crf, "points": points}, extra=extra)
+    return crf, points
+
+
+# -------------------- Ergebnis-Index --------------------
+# Eingabe-Fingerabdruck + ffmpeg-Argumente → bereits erzeugte Ausgabe (und deren Kodierzeit)
+OUTPUT_INDEX_DIR = video_probe.CACHE_DIR / "outputs"
+
+def output_key(settings, infile):
+    """Index-Schlüssel; Pfade sind herausgerechnet, damit auch verschobene Quellen wiedererkannt werden."""
+    fp = video_probe.fingerprint(infile)
+    if not fp:
+        return None
+    in_str = str(Path(infile).resolve())
+    # Das Thread-Budget ändert das Ergebnis nicht wesentlich und bleibt daher außen vor
+    args = ["<in>" if a == in_str else a for a in build_ffmpeg_args(dict(settings, threads=0), in_str, "")]
+    payload = json.dumps([fp, args, output_extension(settings), settings["smart_cut"]])
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def lookup_output(key):
+    """Eintrag zu `key`, sofern die Ausgabe noch unverändert existiert."""
+    try:
+        entry = json.loads((OUTPUT_INDEX_DIR / f"{key}.json").read_text())
+        st = Path(entry["output"]).stat()
+    except (OSError, ValueError, KeyError):
+        return None
+    if (st.st_size, st.st_mtime_ns) != (entry.get("size"), entry.get("mtime_ns")):
+        return None
+    video_probe.touch(OUTPUT_INDEX_DIR / f"{key}.json")
+    return entry
+
+def store_output(key, out_p, seconds):
+    try:
+        st = Path(out_p).stat()
+        OUTPUT_INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        target = OUTPUT_INDEX_DIR / f"{key}.json"
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "output": str(out_p), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "seconds": round(seconds, 1)
+        }))
+        os.replace(tmp, target)
+    except OSError:
+        pass
+
+def format_seconds(seconds):
+    h, rest = divmod(int(seconds), 3600)
+    return f"{h} h {rest // 60:02d} min" if h else f"{rest // 60} min {rest % 60:02d} s"
+
+
+# -------------------- Speicherplatz --------------------
+# Lokaler Zwischenordner für Ausgaben auf Netzlaufwerken (nicht /tmp: oft ein tmpfs im RAM)
+SCRATCH_DIR = video_probe.CACHE_DIR / "scratch"
+SPACE_RESERVE = 64 << 20
+
+def work_dir(parent, kind):
+    """Arbeitsordner für Smart-Cut/Chunks; das PID-Präfix erlaubt nach einem Absturz das Aufräumen."""
+    return Path(tempfile.mkdtemp(prefix=f".{os.getpid()}-{kind}-", dir=parent))
+
+_WORK_DIR_RE = re.compile(r"^\.(\d+)-(smartcut|chunks|part)-")
+_SCRATCH_RE = re.compile(r"^\.?(\d+)-")
+
+def remove_stale_work(folder, scratch=False):
+    """Entfernt Arbeitsordner und Teildateien beendeter Prozesse; im eigenen Zwischenordner alle ihre Dateien.
+
+    In Zielordnern werden nur die eigenen ".<pid>-smartcut-…"/".<pid>-chunks-…"-Ordner und
+    ".<pid>-part-…"-Dateien (partial_path) angefasst.
+    """
+    try:
+        entries = list(Path(folder).iterdir())
+    except OSError:
+        return
+    for entry in entries:
+        m = (_SCRATCH_RE if scratch else _WORK_DIR_RE).match(entry.name)
+        if not m or Path(f"/proc/{m.group(1)}").exists():
+            continue
+        if entry.is_dir():
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            entry.unlink(missing_ok=True)
+
+def estimate_output_bytes(settings, infile, dur):
+    """Grobe Obergrenze der Ausgabegröße für die Platzprüfung vor jedem Job."""
+    qmode, qval = settings["quality_mode"], str(settings["quality_value"])
+    if "Zieldateigröße" in qmode:
+        return sanitize_int(qval, default=700) << 20
+    if "Bitrate" in qmode and dur and dur > 0:
+        # Video plus großzügig bemessene Tonspur
+        return int((sanitize_int(qval, default=5000) + 320) * 125 * dur)
+    try:
+        size = Path(infile).stat().st_size
+    except OSError:
+        return 0
+    total = video_probe.duration(infile)
+    if dur and total and 0 < dur < total:
+        size = int(size * dur / total)
+    # Hochskalierte Ausgaben können größer werden als die Quelle
+    return size * 2 if any(r in settings["dimension"] for r in ("1440p", "2160p")) else size
+
+
+# -------------------- Smart-Cut --------------------
+# Encoder für die Rand-GOPs, passend zum Quell-Codec
+_SMART_CUT_ENCODERS = {
+    "h264": ["-c:v", "libx264", "-crf", "18", "-preset", "medium"],
+    "hevc": ["-c:v", "libx265", "-crf", "20", "-preset", "medium"],
+    "vp9": ["-c:v", "libvpx-vp9", "-crf", "20", "-b:v", "0"],
+    "av1": ["-c:v", "libsvtav1", "-crf", "25"],
+}
+_SMART_CUT_PROFILES = {"High": "high", "Main": "main", "Baseline": "baseline", "High 10": "high10", "Main 10": "main10"}
+
+def cut_range(settings):
+    """(Start, Dauer) in Sekunden; Dauer 0 bedeutet bis zum Dateiende, ungültige Angaben zählen als 0."""
+    def seconds(text):
+        try:
+            return parse_seconds(text)
+        except ValueError:
+            return 0.0
+    return seconds(settings["start"]), seconds(settings["duration"])
+
+def smart_cut_plan(settings, infile):
+    """Zerlegt den Schnittbereich in neu zu kodierende Rand-GOPs und einen kopierbaren Mittelteil.
+
+    Liefert [(start, dauer, kopieren), ...] oder None, wenn Smart-Cut hier nicht möglich ist.
+    """
+    start, dur = cut_range(settings)
+    if start == 0 and dur == 0:
+        return None
+    stream = video_probe.video_stream(infile)
+    codec = (stream or {}).get("codec_name")
+    if codec not in _SMART_CUT_ENCODERS:
+        return None
+    if "WebM" in settings["container"] and codec not in ("vp9", "av1"):
+        return None
+    keyframes = video_probe.keyframes(infile)
+    if not keyframes:
+        return None
+
+    end = start + dur if dur > 0 else (video_probe.duration(infile) or 0.0)
+    k_in = video_probe.keyframe_after(keyframes, start)
+    k_out = video_probe.keyframe_before(keyframes, end)
+    if k_in is None or k_out - k_in < 1.0:
+        return None
+
+    plan = []
+    if k_in - start > 0.001:
+        plan.append((start, k_in - start, False))
+    plan.append((k_in, k_out - k_in, True))
+    if end - k_out > 0.001:
+        plan.append((k_out, end - k_out, False))
+    return plan
+
+def smart_cut_encode_args(infile):
+    """Kodierparameter für die Rand-GOPs: gleicher Codec, Profil, Level, Referenzen und Pixelformat wie die Quelle.
+
+    MP4/MKV übernehmen nur die Parametersätze (avcC/hvcC) des ersten Teils; der kopierte Mittelteil
+    bringt seine eigenen SPS/PPS im Datenstrom mit. Decoder auf ffmpeg-Basis (mpv, VLC, Browser mit
+    Software-Dekodierung) werten diese aus. Player, die nur die Container-Parametersätze lesen
+    (QuickTime/Safari, manche Hardware-Decoder in TVs und Android), können an den Schnittgrenzen
+    Bildfehler zeigen – deshalb werden die kodierrelevanten SPS-Werte der Quelle übernommen.
+    """
+    stream = video_probe.video_stream(infile)
+    codec = stream["codec_name"]
+    args = list(_SMART_CUT_ENCODERS[codec])
+    if stream.get("pix_fmt"):
+        args += ["-pix_fmt", stream["pix_fmt"]]
+    profile = _SMART_CUT_PROFILES.get(stream.get("profile", ""))
+    if profile and codec in ("h264", "hevc"):
+        args += ["-profile:v", profile]
+    level = int(stream.get("level") or 0)
+    if codec == "h264":
+        # ffprobe meldet das Level ×10 (41 = 4.1)
+        if level > 0:
+            args += ["-level:v", f"{level / 10:g}"]
+        if int(stream.get("refs") or 0) > 1:
+            args += ["-refs", str(stream["refs"])]
+    elif codec == "hevc" and level > 0:
+        # HEVC: Level ×30 (120 = 4.0)
+        args += ["-x265-params", f"level-idc={level / 30:g}"]
+    return args
+
+
+# -------------------- Chunk-Kodierung --------------------
+# Mindestlänge eines Stücks (s); kürzere lohnen den Start eines eigenen Encoders nicht
+CHUNK_MIN_SECONDS = 30.0
+
+def chunk_plan(settings, infile, workers):
+    """Teilt den Kodierbereich an Keyframes in etwa gleich lange Stücke für parallele CPU-Encoder.
+
+    Liefert [(start, dauer), ...] oder None, wenn sich das Aufteilen nicht lohnt bzw. nicht möglich ist.
+    """
+    if settings["video"] == "Nur Audio ändern" or workers < 2:
+        return None
+    codec = job_encoder(settings)
+    if "nvenc" in codec or "vaapi" in codec:
+        return None
+
+    start, dur = cut_range(settings)
+    end = start + dur if dur > 0 else (video_probe.duration(infile) or 0.0)
+    # Doppelt so viele Stücke wie Prozesse, damit am Ende keiner allein rechnet
+    count = min(2 * workers, int((end - start) // CHUNK_MIN_SECONDS))
+    if count < 2:
+        return None
+    keyframes = video_probe.keyframes(infile)
+    if not keyframes:
+        return None
+
+    bounds = [start]
+    for n in range(1, count):
+        k = video_probe.nearest_keyframe(keyframes, start + n * (end - start) / count)
+        if k - bounds[-1] >= CHUNK_MIN_SECONDS / 2 and end - k >= CHUNK_MIN_SECONDS / 2:
+            bounds.append(k)
+    if len(bounds) < 2:
+        return None
+    bounds.append(end)
+    return [(a, b - a) for a, b in zip(bounds, bounds[1:])]
+
+
+# -------------------- Fortschritt --------------------
+# Intervall (s), in dem ffmpeg einen Fortschrittsblock schreibt
+PROGRESS_PERIOD = 0.5
+
+ProgressRecord = namedtuple("ProgressRecord", "out_time fps speed bitrate_kbps total_size done")
+
+def _progress_value(raw, suffix="", scale=1.0):
+    try:
+        return float(raw.strip().removesuffix(suffix)) * scale
+    except (AttributeError, ValueError):
+        return None
+
+def read_progress(stream):
+    """Zerlegt die key=value-Blöcke von `ffmpeg -progress` in ProgressRecords (einer pro Block)."""
+    block = {}
+    for line in stream:
+        key, _, val = line.strip().partition("=")
+        if key != "progress":
+            block[key] = val
+            continue
+        yield ProgressRecord(
+            out_time=_progress_value(block.get("out_time_us"), scale=1e-6),
+            fps=_progress_value(block.get("fps")),
+            speed=_progress_value(block.get("speed"), "x"),
+            bitrate_kbps=_progress_value(block.get("bitrate"), "kbits/s"),
+            total_size=_progress_value(block.get("total_size")),
+            done=(val == "end"),
+        )
+        block = {}
+
+EncodeStats = namedtuple("EncodeStats", "returncode wall_seconds cpu_seconds max_rss_kb fps speed")
+
+def measure_ffmpeg(cmd, register=None, prefix=()):
+    """Führt ffmpeg aus und misst Laufzeit, CPU-Zeit und Spitzen-RSS (per os.wait4) sowie fps/Tempo.
+
+    `prefix` (z. B. nice/ionice) muss den Prozess per exec ersetzen, sonst misst wait4 das Falsche.
+    """
+    cmd = list(prefix) + cmd[:1] + ["-progress", "pipe:1", "-nostats"] + cmd[1:]
+    started = time.monotonic()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if register:
+        register(proc)
+    last = None
+    for record in read_progress(proc.stdout):
+        last = record
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return EncodeStats(
+        returncode=proc.returncode,
+        wall_seconds=time.monotonic() - started,
+        cpu_seconds=usage.ru_utime + usage.ru_stime,
+        max_rss_kb=usage.ru_maxrss,
+        fps=last.fps if last else None,
+        speed=last.speed if last else None,
+    )
+
+
+# -------------------- Log --------------------
+# Vollständige ffmpeg-Logs je Job (die Oberfläche zeigt nur einen begrenzten Ausschnitt)
+LOG_DIR = Path.home() / ".local" / "state" / "guideos-videokonverter" / "logs"
+# Aufbewahrung: höchstens so viele Job-Logs und keine älter als so viele Tage
+LOG_KEEP_FILES = 500
+LOG_KEEP_DAYS = 14
+
+def prune_logs(log_dir, keep_files=LOG_KEEP_FILES, keep_days=LOG_KEEP_DAYS):
+    """Löscht alte Job-Logs; wird zu Beginn jedes Stapels aufgerufen."""
+    try:
+        logs = sorted(
+            ((p.stat().st_mtime, p) for p in Path(log_dir).glob("*.log")),
+            reverse=True
+        )
+    except OSError:
+        return
+    cutoff = time.time() - keep_days * 86400
+    for n, (mtime, path) in enumerate(logs):
+        if n >= keep_files or mtime < cutoff:
+            path.unlink(missing_ok=True)
+
+class LogBuffer:
+    """Thread-sicherer Ringpuffer für Logzeilen; die Oberfläche holt sie gebündelt per Timer ab."""
+    def __init__(self, maxlen=2000):
+        self._lines = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def append(self, line):
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self.dropped += 1
+            self._lines.append(line)
+
+    def drain(self):
+        """Liefert (Zeilen, Anzahl seit dem letzten Abholen verworfener Zeilen) und leert den Puffer."""
+        with self._lock:
+            lines, dropped = list(self._lines), self.dropped
+            self._lines.clear()
+            self.dropped = 0
+        return lines, dropped
+
+
+# -------------------- Kernverteilung --------------------
+def _pin_process(pid, cores):
+    """Setzt die CPU-Affinität aller Threads eines Prozesses (neue Threads erben die des Erzeugers)."""
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        tids = [str(pid)]
+    for tid in tids:
+        try:
+            os.sched_setaffinity(int(tid), cores)
+        except (OSError, ValueError):
+            pass
+
+class CoreScheduler:
+    """Teilt die Kerne unter den gleichzeitig laufenden Jobs auf.
+
+    Ein startender Job erhält die freien Kerne geteilt durch die Zahl der Jobs, die noch
+    parallel anlaufen können. Gegen Ende des Stapels werden die Budgets so größer; wartet
+    kein Job mehr, gehen frei werdende Kerne an die noch laufenden. Mit `pin` werden die
+    ffmpeg-Prozesse per sched_setaffinity auf ihre Kerne festgelegt.
+    """
+    def __init__(self, workers, total_jobs, pin=False):
+        try:
+            self.cores = sorted(os.sched_getaffinity(0))
+        except (AttributeError, OSError):
+            self.cores = list(range(os.cpu_count() or 1))
+        self.workers = workers
+        self.waiting = total_jobs
+        self.pin = pin and hasattr(os, "sched_setaffinity")
+        self._free = list(self.cores)
+        self._assigned = {}
+        self._pids = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, idx):
+        """Reserviert Kerne für Job `idx` und liefert deren Anzahl als Thread-Budget."""
+        with self._lock:
+            self.waiting -= 1
+            starting = max(1, min(self.workers - len(self._assigned), self.waiting + 1))
+            count = max(1, len(self._free) // starting)
+            cores, self._free = self._free[:count], self._free[count:]
+            # Mehr Jobs als Kerne: den Kern mit einem anderen Job teilen
+            self._assigned[idx] = cores or [self.cores[idx % len(self.cores)]]
+            return len(self._assigned[idx])
+
+    def attach(self, idx, pid):
+        """Meldet einen ffmpeg-Prozess des Jobs an (auch erneut, um inzwischen gestartete Threads zu erfassen)."""
+        if not self.pin:
+            return
+        with self._lock:
+            self._pids.setdefault(idx, set()).add(pid)
+            cores = list(self._assigned.get(idx, self.cores))
+        _pin_process(pid, cores)
+
+    def detach(self, idx, pid):
+        with self._lock:
+            self._pids.get(idx, set()).discard(pid)
+
+    def release(self, idx):
+        with self._lock:
+            cores = self._assigned.pop(idx, [])
+            self._pids.pop(idx, None)
+            taken = {c for assigned in self._assigned.values() for c in assigned}
+            self._free += [c for c in cores if c not in taken and c not in self._free]
+            if self.waiting > 0 or not self._assigned:
+                return
+            # Kein Job wartet mehr: die freien Kerne reihum den laufenden Jobs zuschlagen
+            running = sorted(self._assigned)
+            for n, core in enumerate(self._free):
+                self._assigned[running[n % len(running)]].append(core)
+            self._free = []
+            repin = [(pid, list(self._assigned[i])) for i in running for pid in self._pids.get(i, ())]
+        if self.pin:
+            for pid, cores in repin:
+                _pin_process(pid, cores)
+
+
+# -------------------- Hintergrundbetrieb --------------------
+# Anteil der CPU-Zeit normal priorisierter Prozesse, ab dem laufende Kodierungen angehalten werden;
+# fortgesetzt wird erst unter der Hälfte davon
+LOAD_THRESHOLD = 0.25
+LOAD_INTERVAL = 2.0
+BACKGROUND_NICE = 19
+
+def read_cpu_times():
+    """(interaktiv, gesamt) in Ticks aus /proc/stat; interaktiv = user + system ohne den nice-Anteil."""
+    try:
+        with open("/proc/stat", encoding="ascii") as fh:
+            fields = [int(v) for v in fh.readline().split()[1:9]]
+    except (OSError, ValueError):
+        return 0, 0
+    user, _nice, system = fields[:3]
+    return user + system, sum(fields)
+
+def background_prefix():
+    """ionice-Aufruf für die Leerlauf-I/O-Klasse (util-linux), sofern vorhanden."""
+    return ["ionice", "-c", "3"] if shutil.which("ionice") else []
+
+
+# -------------------- Vorablesen --------------------
+# Ab diesem Fortschritt eines Jobs wird die nächste Eingabe in den Seitencache gelesen
+PREFETCH_AT = 0.8
+PREFETCH_MAX_BYTES = 512 << 20
+PREFETCH_BLOCK = 4 << 20
+
+def mem_available():
+    try:
+        with open("/proc/meminfo", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+def prefetch_file(path, limit=PREFETCH_MAX_BYTES, stop=None):
+    """Liest den Anfang von `path` in den Seitencache und liefert (Bytes, Sekunden).
+
+    Höchstens `limit` Bytes und nie mehr als ein Viertel des verfügbaren Speichers.
+    """
+    started = time.monotonic()
+    done = 0
+    try:
+        with open(path, "rb", buffering=0) as fh:
+            budget = min(limit, os.fstat(fh.fileno()).st_size, mem_available() // 4 or limit)
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fh.fileno(), 0, budget, os.POSIX_FADV_WILLNEED)
+            # Auf NFS/FUSE bewirkt fadvise oft nichts – daher zusätzlich tatsächlich lesen
+            buf = memoryview(bytearray(PREFETCH_BLOCK))
+            while done < budget and not (stop and stop.is_set()):
+                n = fh.readinto(buf[:min(PREFETCH_BLOCK, budget - done)])
+                if not n:
+                    break
+                done += n
+    except OSError:
+        pass
+    return done, time.monotonic() - started
+
+
+# -------------------- Stapelverarbeitung --------------------
+class BatchRunner:
+    """Qt-freier Stapel-Runner: verteilt Jobs auf einen Worker-Pool und meldet den Fortschritt über Callbacks.
+
+    Ein Job ist ein Dict mit "input", "settings" und optional "output".
+    """
+    def __init__(self, jobs, workers=1, on_log=None, on_job_label=None,
+                 on_job_progress=None, on_total_progress=None, on_job_stats=None,
+                 on_chunk_progress=None, log_dir=LOG_DIR, journal=None, pin_cpus=False,
+                 background=False, load_threshold=LOAD_THRESHOLD,
+                 prefetch_at=PREFETCH_AT, prefetch_bytes=PREFETCH_MAX_BYTES, scratch_dir=None):
+        self.jobs = list(jobs)
+        self.workers = max(1, min(workers, len(self.jobs) or 1))
+        self.on_log = on_log or (lambda text: None)
+        self.on_job_label = on_job_label or (lambda slot, text: None)
+        self.on_job_progress = on_job_progress or (lambda slot, val: None)
+        self.on_total_progress = on_total_progress or (lambda val: None)
+        self.on_job_stats = on_job_stats or (lambda slot, record: None)
+        self.on_chunk_progress = on_chunk_progress or (lambda slot, fractions: None)
+        self.log_dir = log_dir
+        self._job_logs = {}
+        self.journal = journal
+        self._batch = None
+
+        self.running_procs = {}
+        self.proc_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.failed = []
+        self.skipped = 0
+        self.saved_seconds = 0.0
+        self._job_fractions = [0.0] * len(self.jobs)
+        self._reserved_outputs = set()
+        self.scheduler = CoreScheduler(self.workers, len(self.jobs), pin=pin_cpus)
+        self.background = background
+        self.load_threshold = load_threshold
+        self._user_paused = False
+        self._throttled = False
+        self._suspended = False
+        self._sample_suspended = False
+        self.prefetch_at = prefetch_at
+        self.prefetch_bytes = prefetch_bytes
+        self._started = set()
+        self._prefetch_triggered = set()
+        self._prefetched = set()
+        self.prefetch_files = 0
+        self.prefetch_bytes_read = 0
+        self.prefetch_seconds = 0.0
+        self.scratch_dir = Path(scratch_dir) if scratch_dir else None
+        self._space_reserved = {}
+        self._space_by_job = {}
+
+    def cancel(self):
+        self.stop_event.set()
+        with self.proc_lock:
+            for proc in self.running_procs.values():
+                proc.terminate()
+                # Angehaltene Prozesse erhalten SIGTERM erst nach dem Fortsetzen
+                if self._suspended:
+                    proc.send_signal(signal.SIGCONT)
+
+    @property
+    def paused(self):
+        return self._user_paused or self._throttled
+
+    @property
+    def user_paused(self):
+        """Nur die Pause per Schaltfläche, ohne die Drosselung bei hoher Systemlast."""
+        return self._user_paused
+
+    def pause(self):
+        """Hält alle laufenden ffmpeg-Prozesse an (SIGSTOP); bereits Kodiertes bleibt erhalten."""
+        self._user_paused = True
+        self._apply_pause()
+
+    def resume(self):
+        self._user_paused = False
+        self._apply_pause()
+
+    def _apply_pause(self):
+        with self.proc_lock:
+            if self.stop_event.is_set():
+                return
+            # Auch bereits angehaltene erneut anhalten: inzwischen gestartete Prozesse erfassen
+            if self.paused:
+                sig = signal.SIGSTOP
+            elif self._suspended:
+                sig = signal.SIGCONT
+            else:
+                return
+            self._suspended = sig == signal.SIGSTOP
+            if self._suspended:
+                # Gilt nur, solange eine Auto-Preset-Probe läuft (siehe _measure_sample)
+                self._sample_suspended = True
+            for proc in self.running_procs.values():
+                try:
+                    proc.send_signal(sig)
+                except OSError:
+                    pass
+
+    def _govern(self, finished):
+        """Setzt Pause und (im Hintergrundbetrieb) Lastdrosselung durch, bis der Stapel fertig ist."""
+        last = read_cpu_times()
+        while not finished.wait(LOAD_INTERVAL if self.background else 0.5):
+            if self.background:
+                now = read_cpu_times()
+                busy, total = now[0] - last[0], now[1] - last[1]
+                last = now
+                load = busy / total if total > 0 else 0.0
+                if not self._throttled and load > self.load_threshold:
+                    self._throttled = True
+                    self.on_log(f"Systemlast {load * 100:.0f} % – Kodierung angehalten.")
+                elif self._throttled and load < self.load_threshold / 2:
+                    self._throttled = False
+                    self.on_log(f"Systemlast {load * 100:.0f} % – Kodierung läuft weiter.")
+            self._apply_pause()
+
+    def _wait_while_paused(self):
+        while self.paused and not self.stop_event.is_set():
+            self.stop_event.wait(0.5)
+
+    def run(self):
+        """Arbeitet alle Jobs ab und liefert die Liste der fehlgeschlagenen Eingabedateien."""
+        free_slots = queue.Queue()
+        for slot in range(self.workers):
+            free_slots.put(slot)
+
+        # Schon die Auto-Preset-Proben lassen sich pausieren und abbrechen
+        finished = threading.Event()
+        governor = threading.Thread(target=self._govern, args=(finished,), daemon=True)
+        governor.start()
+        try:
+            if self.log_dir:
+                prune_logs(self.log_dir)
+            video_probe.prune_cache()
+            self._resolve_auto_presets()
+            if self.scratch_dir:
+                self._prepare_scratch()
+            if self.journal:
+                self._batch = self.journal.start_batch(self.jobs)
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for idx, job in enumerate(self.jobs):
+                    pool.submit(self._convert_one, idx, job, free_slots)
+        finally:
+            finished.set()
+            governor.join()
+        # Regulär (auch per Abbrechen) beendet: nichts mehr fortzusetzen
+        if self.journal:
+            self.journal.finish_batch(self._batch)
+        return self.failed
+
+    def _prepare_scratch(self):
+        """Legt den Zwischenordner an und räumt Reste abgestürzter Läufe (Präfix = PID) weg."""
+        try:
+            self.scratch_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            self.on_log(f"Zwischenordner {self.scratch_dir} nicht nutzbar ({e.strerror}) – schreibe direkt ins Ziel.")
+            self.scratch_dir = None
+            return
+        remove_stale_work(self.scratch_dir, scratch=True)
+
+    def _staging_path(self, idx, out_p):
+        """Arbeitsname der Ausgabe: im lokalen Zwischenordner oder als temporärer Name im Zielordner."""
+        if self.scratch_dir:
+            return self.scratch_dir / f"{os.getpid()}-{idx}-{out_p.name}"
+        return partial_path(out_p)
+
+    def _reserve_space(self, idx, settings, in_p, out_p, part_p, dur, chunked):
+        """Prüft den freien Platz in Zwischen- und Zielordner und reserviert ihn für den Job.
+
+        Liefert eine Fehlermeldung oder None. Parallele Jobs auf demselben Dateisystem
+        werden gegeneinander verrechnet.
+        """
+        need = estimate_output_bytes(settings, in_p, dur) + SPACE_RESERVE
+        # Beim Aufteilen liegen Stücke und zusammengefügte Datei gleichzeitig vor
+        needs = [(part_p.parent, need * 2 if chunked else need)]
+        if part_p.parent != out_p.parent:
+            needs.append((out_p.parent, need))
+        with self.proc_lock:
+            reserved = []
+            for folder, amount in needs:
+                try:
+                    dev, free = os.stat(folder).st_dev, shutil.disk_usage(folder).free
+                except OSError:
+                    continue
+                if dev in (d for d, _ in reserved):
+                    continue
+                if free - self._space_reserved.get(dev, 0) < amount:
+                    return (f"Zu wenig Speicherplatz in {folder}: {free >> 20} MB frei, "
+                            f"etwa {amount >> 20} MB benötigt.")
+                reserved.append((dev, amount))
+            for dev, amount in reserved:
+                self._space_reserved[dev] = self._space_reserved.get(dev, 0) + amount
+            self._space_by_job[idx] = reserved
+        return None
+
+    def _release_space(self, idx):
+        with self.proc_lock:
+            for dev, amount in self._space_by_job.pop(idx, []):
+                self._space_reserved[dev] -= amount
+
+    def _resolve_auto_presets(self):
+        """Ersetzt "Auto (Ziel: N× Echtzeit)" durch ein festes Preset, gemessen an der ersten passenden Eingabe."""
+        chosen = {}
+        for job in self.jobs:
+            settings = job["settings"]
+            target = auto_preset_target(settings["preset"])
+            if target is None or self.stop_event.is_set():
+                continue
+            group = (settings["video"], settings["hw_mode"], settings["dimension"], settings["container"], target)
+            if group not in chosen:
+                self.on_log(f"Auto-Preset: Probekodierung mit {Path(job['input']).name} …")
+                preset, speed = choose_preset(settings, job["input"], target, self._measure_sample)
+                if self.stop_event.is_set():
+                    return
+                measured = f"{speed:.1f}× Echtzeit" if speed else "Ziel nicht erreichbar"
+                self.on_log(f"Auto-Preset: {preset} ({measured}, Ziel {target:g}×)")
+                chosen[group] = preset
+            job["settings"] = dict(settings, preset=chosen[group])
+
+    def _measure_sample(self, cmd):
+        """Führt eine Auto-Preset-Probe mit der Priorität der Jobs aus, abbrechbar und pausierbar.
+
+        Eine zwischendurch angehaltene Probe (Pause, Lastdrosselung) misst ein zu niedriges Tempo:
+        sie wird nach dem Fortsetzen wiederholt und notfalls als fehlgeschlagen (None) gemeldet,
+        damit choose_preset sie nicht im Cache ablegt.
+        """
+        # Im Hintergrundbetrieb wie die Jobs mit nice, sonst zählt die Probe als Systemlast und drosselt sich selbst
+        prefix = ["nice", "-n", str(BACKGROUND_NICE)] + background_prefix() if self.background else []
+        for _ in range(AUTO_PRESET_SAMPLE_RETRIES):
+            self._wait_while_paused()
+            if self.stop_event.is_set():
+                return None
+            self._sample_suspended = False
+            try:
+                stats = measure_ffmpeg(cmd, register=self._register_sample, prefix=prefix)
+            finally:
+                with self.proc_lock:
+                    for key in [k for k in self.running_procs if isinstance(k, tuple) and k[0] == "sample"]:
+                        del self.running_procs[key]
+            if not self._sample_suspended:
+                return stats
+            self.on_log("Auto-Preset: Probe wurde angehalten – wird wiederholt.")
+        return None
+
+    def _register_sample(self, proc):
+        """Nimmt einen Probeprozess (vor dem eigentlichen Stapel) in die Verwaltung für Abbrechen/Pause auf."""
+        with self.proc_lock:
+            self.running_procs[("sample", proc.pid)] = proc
+            if self.stop_event.is_set():
+                proc.terminate()
+            elif self._suspended:
+                proc.send_signal(signal.SIGSTOP)
+                self._sample_suspended = True
+
+    def _journal(self, idx, state, **fields):
+        if self.journal:
+            self.journal.update(self._batch, idx, state, **fields)
+
+    def _report_progress(self, slot, idx, pct):
+        self.on_job_progress(slot, pct)
+        with self.proc_lock:
+            self._job_fractions[idx] = pct
+            done = sum(self._job_fractions)
+        self.on_total_progress(done / len(self._job_fractions))
+        if self.prefetch_at and pct >= self.prefetch_at:
+            self._prefetch_next(idx)
+
+    def _prefetch_next(self, idx):
+        """Jeder Job stößt einmal das Vorablesen der nächsten noch nicht gestarteten Eingabe an."""
+        with self.proc_lock:
+            if idx in self._prefetch_triggered:
+                return
+            self._prefetch_triggered.add(idx)
+            nxt = next((i for i in range(len(self.jobs)) if i not in self._started and i not in self._prefetched), None)
+            if nxt is None:
+                return
+            self._prefetched.add(nxt)
+        threading.Thread(target=self._prefetch, args=(nxt,), daemon=True).start()
+
+    def _prefetch(self, idx):
+        read, seconds = prefetch_file(self.jobs[idx]["input"], self.prefetch_bytes, self.stop_event)
+        if read:
+            with self.proc_lock:
+                self.prefetch_files += 1
+                self.prefetch_bytes_read += read
+                self.prefetch_seconds += seconds
+
+    def _convert_one(self, idx, job, free_slots):
+        if self.stop_event.is_set(): return
+        if self.background:
+            # Nice gilt unter Linux je Thread und wird an alle hier gestarteten Threads und Prozesse vererbt
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), BACKGROUND_NICE)
+            except OSError:
+                pass
+        slot = free_slots.get()
+        try:
+            self._run_job(slot, idx, job)
+        except Exception as e:
+            self.failed.append(job["input"])
+            self._journal(idx, "failed")
+            self.on_log(f"FEHLER: {e}\n")
+        finally:
+            self.scheduler.release(idx)
+            log = self._job_logs.pop(idx, None)
+            if log:
+                log.close()
+            free_slots.put(slot)
+
+    def _open_job_log(self, idx, in_p):
+        if not self.log_dir:
+            return
+        try:
+            Path(self.log_dir).mkdir(parents=True, exist_ok=True)
+            path = Path(self.log_dir) / f"{time.strftime('%Y%m%d-%H%M%S')}-{idx:03d}-{in_p.stem}.log"
+            self._job_logs[idx] = open(path, "w", encoding="utf-8", errors="replace")
+            self.on_log(f"Log: {path}")
+        except OSError:
+            pass
+
+    def _run_job(self, slot, idx, job):
+        self._wait_while_paused()
+        if self.stop_event.is_set():
+            return
+        with self.proc_lock:
+            self._started.add(idx)
+        settings = job["settings"]
+        in_p = Path(job["input"]).resolve()
+        prefix = "Fortschritt" if slot == 0 else f"Job {slot + 1}"
+        self.on_job_label(slot, f"{prefix}: {in_p.name}")
+        self.on_job_progress(slot, 0.0)
+        # Parallele Jobs teilen sich die Kerne, statt dass jeder Encoder alle beansprucht
+        budget = self.scheduler.acquire(idx)
+        if not settings.get("threads"):
+            settings = dict(settings, threads=budget)
+
+        if job.get("output"):
+            out_p = Path(job["output"]).resolve()
+            out_p.parent.mkdir(parents=True, exist_ok=True)
+        else:
+            out_dir = output_dir_for(in_p, settings)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            # Parallele Jobs dürfen sich nicht denselben Zielnamen teilen
+            with self.proc_lock:
+                out_p = make_unique_path(out_dir / (in_p.stem + output_extension(settings)), self._reserved_outputs)
+                self._reserved_outputs.add(out_p)
+
+        # Unbekannte Dauer: Fortschritt als unbestimmt (-1) melden statt sofort 100 %
+        dur = cut_range(settings)[1] or probe_duration_seconds(in_p)
+
+        plan = smart_cut_plan(settings, in_p) if settings["smart_cut"] else None
+        if settings["smart_cut"] and not plan:
+            self.on_log(f"Smart-Cut für {in_p.name} nicht möglich – Bereich wird neu kodiert.")
+        chunks = None
+        if settings["chunked"] and not plan:
+            chunks = chunk_plan(settings, in_p, self.chunk_workers())
+            if not chunks:
+                self.on_log(f"Aufteilen lohnt sich für {in_p.name} nicht – wird am Stück kodiert.")
+
+        self.on_log(f"\nSTART: {in_p.name} ({job_threads(settings)} Threads)\n")
+        self._open_job_log(idx, in_p)
+        self._journal(idx, "running", output=str(out_p))
+        if needs_loudness(settings):
+            self._measure_loudness(settings, in_p, idx, slot)
+            if self.stop_event.is_set():
+                return
+        if quality_metric(settings["quality_mode"]) and settings["video"] != "Nur Audio ändern":
+            settings = self._resolve_target_quality(settings, in_p, idx, slot)
+            if settings is None:
+                return
+
+        key = output_key(settings, in_p)
+        reuse = "Überspringen" in settings["reuse"] or "Hardlink" in settings["reuse"]
+        if key and reuse and self._reuse_output(key, settings, in_p, out_p, idx):
+            self._report_progress(slot, idx, 1.0)
+            return
+
+        # Bis zum Erfolg unter temporärem Namen (bzw. im lokalen Zwischenordner) schreiben:
+        # ein Abbruch hinterlässt keine halbe Zieldatei
+        part_p = self._staging_path(idx, out_p)
+        remove_stale_work(out_p.parent)
+        problem = self._reserve_space(idx, settings, in_p, out_p, part_p, dur, bool(chunks))
+        if problem:
+            self.failed.append(job["input"])
+            self._journal(idx, "failed")
+            self.on_log(f"FEHLER: {problem} ({in_p.name})\n")
+            self._report_progress(slot, idx, 1.0)
+            return
+        return_code = None
+        started = time.monotonic()
+        try:
+            if plan:
+                return_code = self._run_smart_cut(plan, settings, in_p, part_p, idx, slot)
+            elif chunks:
+                return_code = self._run_chunked(chunks, settings, in_p, part_p, idx, slot)
+            else:
+                cmd = ["ffmpeg"] + build_ffmpeg_args(settings, str(in_p), str(part_p)) + ["-y", str(part_p)]
+                return_code = self._run_ffmpeg(cmd, idx, slot, dur)
+            if return_code == 0:
+                commit_output(part_p, out_p)
+                self._journal(idx, "done")
+                if key:
+                    store_output(key, out_p, time.monotonic() - started)
+        finally:
+            part_p.unlink(missing_ok=True)
+            self._release_space(idx)
+
+        if return_code is None:
+            return
+        if return_code != 0 and not self.stop_event.is_set():
+            self.failed.append(job["input"])
+            self._journal(idx, "failed")
+            self.on_log(f"FEHLER: Konvertierung fehlgeschlagen ({in_p.name}).\n")
+        if not self.stop_event.is_set():
+            self._report_progress(slot, idx, 1.0)
+
+    def _reuse_output(self, key, settings, in_p, out_p, idx):
+        """Liegt schon ein Ergebnis mit gleicher Eingabe und gleichen Argumenten vor, entfällt das Kodieren."""
+        entry = lookup_output(key)
+        if not entry:
+            return False
+        existing = Path(entry["output"])
+        if "Hardlink" in settings["reuse"] and existing.parent != out_p.parent:
+            try:
+                os.link(existing, out_p)
+            except OSError as e:
+                self.on_log(f"{in_p.name}: Hardlink auf {existing} nicht möglich ({e.strerror}) – wird neu kodiert.")
+                return False
+            self.on_log(f"{in_p.name}: bereits kodiert – Hardlink auf {existing}")
+        else:
+            out_p = existing
+            self.on_log(f"{in_p.name}: bereits kodiert ({existing}) – übersprungen")
+        with self.proc_lock:
+            self.skipped += 1
+            self.saved_seconds += entry.get("seconds", 0.0)
+        self._journal(idx, "done", output=str(out_p))
+        return True
+
+    def summary(self):
+        """Kurzbericht über wiederverwendete Ergebnisse und Vorablesen (leer, wenn beides nicht griff)."""
+        lines = []
+        if self.skipped:
+            lines.append(f"{self.skipped} Datei(en) bereits kodiert – ca. {format_seconds(self.saved_seconds)} Kodierzeit eingespart.")
+        if self.prefetch_files:
+            # Die Lesezeit im Hintergrund entspricht der Wartezeit, die sonst zu Beginn des Jobs anfiele
+            lines.append(
+                f"{self.prefetch_files} Eingabe(n) vorab gelesen ({self.prefetch_bytes_read / (1 << 20):.0f} MB) – "
+                f"bis zu {format_seconds(self.prefetch_seconds)} Wartezeit eingespart."
+            )
+        return "\n".join(lines)
+
+    def _measure_loudness(self, settings, in_p, idx, slot):
+        """Messdurchlauf der zweistufigen Lautheitsnormalisierung; bereits gemessene Dateien kommen aus dem Cache."""
+        def register(proc):
+            with self.proc_lock:
+                self.running_procs[idx] = proc
+                if self.stop_event.is_set():
+                    proc.terminate()
+
+        self.on_job_progress(slot, -1.0)
+        try:
+            measured = video_probe.loudness(in_p, *cut_range(settings), register=register)
+        finally:
+            with self.proc_lock:
+                self.running_procs.pop(idx, None)
+        if measured:
+            self.on_log(f"Lautheit {in_p.name}: {measured['I']:.1f} LUFS, TP {measured['TP']:.1f} dBTP, LRA {measured['LRA']:.1f} LU")
+        elif not self.stop_event.is_set():
+            self.on_log(f"Lautheitsmessung für {in_p.name} nicht möglich – einstufige Normalisierung.")
+        self.on_job_progress(slot, 0.0)
+
+    def _resolve_target_quality(self, settings, in_p, idx, slot):
+        """Zielqualität → fester CRF per Probekodierung; None bei Abbruch."""
+        metric = quality_metric(settings["quality_mode"])
+        default = 93.0 if metric == "vmaf" else DEFAULT_SSIM_TARGET
+        try:
+            target = float(str(settings["quality_value"]).replace(",", "."))
+        except ValueError:
+            target = default
+        if metric == "ssim" and "VMAF" in settings["quality_mode"]:
+            self.on_log("libvmaf ist in diesem ffmpeg nicht enthalten – Zielqualität wird per SSIM bestimmt.")
+            target = DEFAULT_SSIM_TARGET
+        if metric == "ssim" and target > 1:
+            target /= 100
+
+        procs = []
+        def register(proc):
+            with self.proc_lock:
+                self.running_procs[(idx, "crf", len(procs))] = proc
+                procs.append(proc)
+                if self.stop_event.is_set():
+                    proc.terminate()
+
+        self.on_job_progress(slot, -1.0)
+        try:
+            crf, points = find_crf(settings, in_p, target, metric, self.chunk_workers(), register)
+        finally:
+            with self.proc_lock:
+                for n in range(len(procs)):
+                    self.running_procs.pop((idx, "crf", n), None)
+        self.on_job_progress(slot, 0.0)
+        if self.stop_event.is_set():
+            return None
+        if crf is None:
+            self.on_log(f"Zielqualität für {in_p.name} nicht messbar – kodiere mit CRF 23.")
+            crf = 23
+        else:
+            measured = ", ".join(f"CRF {c}: {v:.4g}" for c, v in points)
+            self.on_log(f"Zielqualität {in_p.name}: {metric.upper()} {target:g} → CRF {crf} ({measured})")
+        return dict(settings, quality_mode="CQ (Qualitätsbasiert)", quality_value=str(crf))
+
+    def _run_ffmpeg(self, cmd, idx, slot, dur, base=0.0, span=1.0, key=None, on_record=None):
+        """Startet einen abbrechbaren ffmpeg-Prozess; dessen Fortschritt zählt als Anteil `span` ab `base`.
+
+        Fortschritt kommt strukturiert über `-progress pipe:1`, das Log getrennt über stderr.
+        Mit `on_record` wertet der Aufrufer die Fortschrittsblöcke selbst aus; `key` trennt
+        mehrere gleichzeitige Prozesse eines Jobs.
+        """
+        key = idx if key is None else key
+        cmd = cmd[:1] + ["-progress", "pipe:1", "-nostats", "-stats_period", str(PROGRESS_PERIOD)] + cmd[1:]
+        if self.background:
+            cmd = background_prefix() + cmd
+        with self.proc_lock:
+            if self.stop_event.is_set(): return None
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+            self.running_procs[key] = proc
+            if self._suspended:
+                proc.send_signal(signal.SIGSTOP)
+        self.scheduler.attach(idx, proc.pid)
+        if idx in self._job_logs:
+            self._job_logs[idx].write("$ " + " ".join(cmd) + "\n")
+        log_thread = threading.Thread(target=self._pump_log, args=(proc.stderr, idx), daemon=True)
+        log_thread.start()
+        pinned = False
+        try:
+            for record in read_progress(proc.stdout):
+                if not pinned:
+                    # Die Encoder-Threads entstehen erst nach dem Start – jetzt alle erfassen
+                    self.scheduler.attach(idx, proc.pid)
+                    pinned = True
+                if on_record:
+                    on_record(record)
+                    continue
+                self.on_job_stats(slot, record)
+                if dur and record.out_time is not None:
+                    self._report_progress(slot, idx, base + span * min(1.0, record.out_time / dur))
+                elif not dur:
+                    self.on_job_progress(slot, -1.0)
+            return_code = proc.wait()
+            log_thread.join()
+            return return_code
+        finally:
+            self.scheduler.detach(idx, proc.pid)
+            with self.proc_lock:
+                self.running_procs.pop(key, None)
+
+    def _pump_log(self, stream, idx):
+        log = self._job_logs.get(idx)
+        for line in stream:
+            if log:
+                log.write(line)
+            self.on_log(line.rstrip())
+
+    def _run_smart_cut(self, plan, settings, in_p, out_p, idx, slot):
+        """Kopiert den Mittelteil, kodiert nur die Rand-GOPs neu und fügt alles verlustfrei zusammen."""
+        codec = video_probe.video_stream(in_p)["codec_name"]
+        # MPEG-TS trägt SPS/PPS im Stream, damit vertragen sich kopierte und neu kodierte Teile
+        part_ext = ".ts" if codec in ("h264", "hevc") else ".mkv"
+        encode = smart_cut_encode_args(in_p)
+        total = sum(length for _, length, _ in plan)
+        work = work_dir(out_p.parent, "smartcut")
+        try:
+            parts, done = [], 0.0
+            for n, (start, length, copy) in enumerate(plan):
+                part = work / f"part{n}{part_ext}"
+                # Beim Kopieren minimal hinter den Keyframe suchen, damit genau dieser getroffen wird –
+                # und ebenso knapp vor dem nächsten enden, der schon zum neu kodierten Ende gehört
+                seek, span = (start + 0.001, length - 0.001) if copy else (start, length)
+                # Die Rand-GOPs ungedreht kodieren, sonst passen sie nicht zu den kopierten Bildern
+                cmd = [
+                    "ffmpeg", "-noautorotate", "-ss", f"{seek:.6f}", "-i", str(in_p), "-t", f"{span:.6f}",
+                    "-map", "0:v:0", "-an", "-sn"
+                ] + (["-c:v", "copy"] if copy else encode) + ["-y", str(part)]
+                rc = self._run_ffmpeg(cmd, idx, slot, length, 0.9 * done / total, 0.9 * length / total)
+                if rc != 0:
+                    return rc
+                parts.append(part)
+                done += length
+
+            listfile = work / "parts.txt"
+            listfile.write_text("".join(f"file '{p.name}'\n" for p in parts))
+            start = plan[0][0]
+            cmd = [
+                "ffmpeg", "-f", "concat", "-safe", "0", "-i", str(listfile),
+                "-ss", f"{start:.6f}", "-t", f"{total:.6f}", "-i", str(in_p),
+                "-map", "0:v:0", "-map", "1:a:0?", "-c:v", "copy"
+            ]
+            # Kopierte Bilder lassen sich nicht drehen: die Drehung der Quelle immer als Metadatum übernehmen
+            cmd += ["-metadata:s:v:0", f"rotate={video_probe.rotation(in_p)}"]
+            cmd += audio_args(settings, in_p) + ["-y", str(out_p)]
+            return self._run_ffmpeg(cmd, idx, slot, total, 0.9, 0.1)
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+    def chunk_workers(self):
+        """Encoder-Prozesse je Chunk-Job; die Kerne teilen sich mit den übrigen parallelen Jobs."""
+        return max(2, default_job_count("") // self.workers)
+
+    def _run_chunked(self, chunks, settings, in_p, out_p, idx, slot):
+        """Kodiert die Stücke parallel mit identischen Parametern, die Tonspur einmal getrennt, und fügt alles verlustfrei zusammen."""
+        work = work_dir(out_p.parent, "chunks")
+        total = sum(length for _, length in chunks)
+        done = [0.0] * len(chunks)
+        done_lock = threading.Lock()
+        self.on_log(f"{in_p.name}: {len(chunks)} Stücke, {self.chunk_workers()} parallel")
+        chunk_settings = dict(settings, threads=max(1, job_threads(settings) // self.chunk_workers()))
+
+        def chunk_progress(n):
+            def on_record(record):
+                if record.out_time is None:
+                    return
+                with done_lock:
+                    done[n] = min(chunks[n][1], record.out_time)
+                    fractions = [d / length for d, (_, length) in zip(done, chunks)]
+                    frac = sum(done) / total
+                self.on_chunk_progress(slot, fractions)
+                self._report_progress(slot, idx, 0.95 * frac)
+            return on_record
+
+        def encode(n):
+            start, length = chunks[n]
+            cmd = ["ffmpeg"]
+            if settings["keep_rotation"]:
+                cmd += ["-noautorotate"]
+            cmd += [
+                "-ss", f"{start:.6f}", "-i", str(in_p), "-t", f"{length:.6f}",
+                "-map", "0:v:0", "-an", "-sn"
+            ] + video_args(chunk_settings, in_p) + ["-y", str(work / f"chunk{n:04d}.mkv")]
+            return self._run_ffmpeg(cmd, idx, slot, length, key=(idx, n), on_record=chunk_progress(n))
+
+        def encode_audio():
+            cmd = [
+                "ffmpeg", "-ss", f"{chunks[0][0]:.6f}", "-i", str(in_p), "-t", f"{total:.6f}",
+                "-map", "0:a:0", "-vn", "-sn"
+            ] + audio_args(settings, in_p) + ["-y", str(work / "audio.mka")]
+            return self._run_ffmpeg(cmd, idx, slot, total, key=(idx, "audio"), on_record=lambda record: None)
+
+        try:
+            has_audio = video_probe.has_audio(in_p)
+            with ThreadPoolExecutor(max_workers=self.chunk_workers()) as pool:
+                futures = [pool.submit(encode_audio)] if has_audio else []
+                futures += [pool.submit(encode, n) for n in range(len(chunks))]
+                codes = [f.result() for f in futures]
+            if None in codes:
+                return None
+            failed = next((rc for rc in codes if rc != 0), None)
+            if failed is not None:
+                return failed
+
+            listfile = work / "chunks.txt"
+            listfile.write_text("".join(f"file 'chunk{n:04d}.mkv'\n" for n in range(len(chunks))))
+            cmd = ["ffmpeg", "-f", "concat", "-safe", "0", "-i", str(listfile)]
+            if has_audio:
+                cmd += ["-i", str(work / "audio.mka"), "-map", "0:v:0", "-map", "1:a:0"]
+            cmd += ["-c", "copy"]
+            if settings["keep_rotation"]:
+                cmd += ["-metadata:s:v:0", "rotate=90"]
+            cmd += ["-y", str(out_p)]
+            return self._run_ffmpeg(cmd, idx, slot, total, 0.95, 0.05)
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+# -------------------- Batch-CLI --------------------
+def load_manifest(path):
+    """Liest ein Job-Manifest (JSON-Liste bzw. {"jobs": [...]} oder CSV mit Kopfzeile)."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as fh:
+            rows = list(csv.DictReader(fh))
+    else:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        rows = data.get("jobs", []) if isinstance(data, dict) else data
+    for row in rows:
+        if not row.get("input"):
+            raise ValueError(f"Manifest-Eintrag ohne 'input': {row}")
+    return rows
+
+_CLI_CODECS = {"h264": "H.264", "h265": "H.265", "hevc": "H.265", "vp9": "VP9", "av1": "AV1", "copy": "Nur Audio ändern"}
+_CLI_HW = {"auto": "Automatisch", "nvidia": "NVIDIA", "amd": "AMD", "intel": "Intel", "cpu": "Software (CPU)"}
+_CLI_QMODES = {
+    "cq": "CQ", "bitrate": "Bitrate", "size": "Zieldateigröße",
+    "ssim": "Zielqualität (SSIM)", "vmaf": "Zielqualität (VMAF)",
+}
+_CLI_CONTAINERS = {"mp4": "MP4 (.mp4)", "mkv": "Matroska (.mkv)", "webm": "WebM (.webm)"}
+_CLI_AUDIO = {"opus": "Opus (WebM/MKV)", "aac": "AAC", "pcm": "PCM", "flac": "FLAC (mkv)"}
+_CLI_DIMENSIONS = ["original", "720p", "1080p", "1440p", "2160p"]
+_CLI_REUSE = {"skip": "Überspringen", "link": "Hardlink anlegen", "off": "Immer neu kodieren"}
+_CLI_SHARPEN = {"aus": "Aus", "leicht": "Leicht", "mittel": "Mittel", "stark": "Stark"}
+_CLI_BIT_DEPTHS = {"8": "8-Bit", "10": "10-Bit"}
+_CLI_QUALITY_DEFAULTS = {"cq": "23", "bitrate": "5000", "size": "700", "ssim": "0.98", "vmaf": "93"}
+
+# Manifest-Spalten mit fester Werteliste: dieselben Kürzel wie auf der Kommandozeile
+_MANIFEST_CHOICES = {
+    "video": _CLI_CODECS, "hw_mode": _CLI_HW, "container": _CLI_CONTAINERS, "audio": _CLI_AUDIO,
+    "quality_mode": _CLI_QMODES, "sharpen": _CLI_SHARPEN, "reuse": _CLI_REUSE,
+    "dimension": {d: d for d in _CLI_DIMENSIONS}, "bit_depth": _CLI_BIT_DEPTHS,
+}
+
+def _cli_time(text):
+    parse_seconds(text)
+    return text.strip()
+
+def _cli_preset(text):
+    """x264-Preset-Name oder auto:N als Preset-Einstellung."""
+    text = text.strip()
+    if text in PRESETS or auto_preset_target(text):
+        return text
+    m = re.match(r"^auto:(\d+(?:[.,]\d+)?)$", text)
+    if m and float(m.group(1).replace(",", ".")) > 0:
+        return f"Auto (Ziel: {m.group(1)}× Echtzeit)"
+    raise ValueError(f"Unbekanntes Preset {text!r} (erlaubt: {', '.join(PRESETS)} oder auto:N)")
+
+def _arg_type(parse):
+    """Parser-Funktion als argparse-Typ; ihre Fehlermeldung erscheint statt "invalid value"."""
+    def convert(text):
+        try:
+            return parse(text)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(str(exc)) from None
+    return convert
+
+def manifest_settings(row, base):
+    """Einstellungen eines Manifest-Eintrags auf Basis der Kommandozeilen-Einstellungen `base`.
+
+    Auswahlwerte nehmen dieselben Kürzel wie die Optionen (z. B. video=h265, container=webm) oder
+    den vollen Text der Oberfläche; unbekannte Spalten und Werte sind ein Fehler.
+    """
+    overrides = {}
+    for key, val in row.items():
+        if key in ("input", "output") or val is None or val == "":
+            continue
+        if key not in DEFAULT_SETTINGS:
+            raise ValueError(f"Unbekannte Manifest-Spalte {key!r} bei {row['input']}")
+        if key in _MANIFEST_CHOICES:
+            table = _MANIFEST_CHOICES[key]
+            text = str(val).strip()
+            if text.lower() in table:
+                val = table[text.lower()]
+            elif text not in table.values():
+                raise ValueError(
+                    f"Unbekannter Wert {text!r} für {key!r} bei {row['input']} (erlaubt: {', '.join(table)})"
+                )
+        elif key in ("start", "duration"):
+            val = _cli_time(str(val))
+        elif key == "preset":
+            val = _cli_preset(str(val))
+        overrides[key] = val
+    if "quality_mode" in overrides and "quality_value" not in overrides:
+        mode = next(k for k, v in _CLI_QMODES.items() if v == overrides["quality_mode"])
+        overrides["quality_value"] = _CLI_QUALITY_DEFAULTS[mode]
+    return make_settings({**base, **overrides})
+
+def build_arg_parser():
+    p = argparse.ArgumentParser(
+        prog="guideos-videokonverter --batch",
+        description="Stapelkonvertierung ohne grafische Oberfläche."
+    )
+    p.add_argument("--batch", action="store_true", help=argparse.SUPPRESS)
+    p.add_argument("files", nargs="*", help="Eingabedateien")
+    p.add_argument("--manifest", help="Job-Manifest als JSON oder CSV (Spalte 'input', optional 'output' und Einstellungen)")
+    p.add_argument("--codec", choices=_CLI_CODECS, default="h264")
+    p.add_argument("--hw", choices=_CLI_HW, default="auto")
+    p.add_argument("--container", choices=_CLI_CONTAINERS, default="mp4")
+    p.add_argument("--audio", choices=_CLI_AUDIO, default="aac")
+    p.add_argument("--audio-copy", action="store_true")
+    p.add_argument("--lufs", type=int, default=-16)
+    p.add_argument("--quality-mode", choices=_CLI_QMODES, default="cq")
+    p.add_argument("--quality", help="CRF, kbit/s, MB oder SSIM/VMAF-Zielwert – je nach --quality-mode")
+    p.add_argument("--preset", type=_arg_type(_cli_preset), default="medium",
+                   help="x264-Preset-Name oder auto:N (langsamstes Preset mit N-facher Echtzeit)")
+    p.add_argument("--start", type=_arg_type(_cli_time), default="00:00:00", help="HH:MM:SS oder Sekunden")
+    p.add_argument("--duration", type=_arg_type(_cli_time), default="0", help="HH:MM:SS oder Sekunden (0 = bis zum Ende)")
+    p.add_argument("--smart-cut", action="store_true", help="Mittelteil kopieren, nur Rand-GOPs neu kodieren")
+    p.add_argument("--chunked", action="store_true", help="lange Dateien an Keyframes teilen und parallel kodieren")
+    p.add_argument("--dimension", choices=_CLI_DIMENSIONS, default="original")
+    p.add_argument("--sharpen", choices=_CLI_SHARPEN, default="aus")
+    p.add_argument("--10bit", dest="ten_bit", action="store_true")
+    p.add_argument("--no-rotation", action="store_true")
+    p.add_argument("--output-dir", default="")
+    p.add_argument("--save-in-source", action="store_true")
+    p.add_argument("--jobs", type=int, default=0, help="Parallele Jobs (0 = automatisch)")
+    p.add_argument("--threads", type=int, default=0, help="Threads je Job (0 = Kerne auf die Jobs aufteilen)")
+    p.add_argument("--pin-cpus", action="store_true", help="jeden Job per CPU-Affinität auf seine Kerne festlegen")
+    p.add_argument("--scratch-dir", nargs="?", const=str(SCRATCH_DIR), default=None,
+                   help=f"lokal zwischenspeichern und erst fertige Dateien ins Ziel verschieben (Standard: {SCRATCH_DIR})")
+    p.add_argument("--background", action="store_true",
+                   help="mit niedriger CPU-/I/O-Priorität kodieren und bei hoher Systemlast anhalten")
+    p.add_argument("--prefetch-at", type=float, default=PREFETCH_AT * 100,
+                   help="Fortschritt in %%, ab dem die nächste Eingabe vorab gelesen wird (0 = aus)")
+    p.add_argument("--prefetch-mb", type=int, default=PREFETCH_MAX_BYTES >> 20,
+                   help="höchstens so viele MB je Eingabe vorab lesen")
+    p.add_argument("--load-threshold", type=float, default=LOAD_THRESHOLD * 100,
+                   help="Systemlast in %% (ohne Kodierung), ab der im Hintergrundbetrieb angehalten wird")
+    p.add_argument("--no-encoder-test", action="store_true", help="Encoder nicht per Testkodierung prüfen")
+    p.add_argument("--rescan", action="store_true", help="Grafikkarten und Encoder neu erkennen")
+    p.add_argument("--resume", action="store_true", help="nach einem Absturz unterbrochene Jobs fortsetzen")
+    p.add_argument("--reuse", choices=_CLI_REUSE, default="skip",
+                   help="bereits mit gleichen Einstellungen kodierte Eingaben überspringen, verlinken oder neu kodieren")
+    return p
+
+def settings_from_args(opts):
+    return make_settings({
+        "hw_mode": _CLI_HW[opts.hw],
+        "container": _CLI_CONTAINERS[opts.container],
+        "video": _CLI_CODECS[opts.codec],
+        "audio": _CLI_AUDIO[opts.audio],
+        "audio_copy": opts.audio_copy,
+        "lufs": opts.lufs,
+        "quality_mode": _CLI_QMODES[opts.quality_mode],
+        "quality_value": opts.quality or _CLI_QUALITY_DEFAULTS[opts.quality_mode],
+        "preset": opts.preset,
+        "dimension": opts.dimension,
+        "sharpen": _CLI_SHARPEN[opts.sharpen],
+        "bit_depth": _CLI_BIT_DEPTHS["10" if opts.ten_bit else "8"],
+        "keep_rotation": not opts.no_rotation,
+        "start": opts.start,
+        "duration": opts.duration,
+        "smart_cut": opts.smart_cut,
+        "chunked": opts.chunked,
+        "reuse": _CLI_REUSE[opts.reuse],
+        "threads": opts.threads,
+        "output_dir": opts.output_dir,
+        "save_in_source": opts.save_in_source,
+    })
+
+def main(argv=None):
+    global VALIDATE_ENCODERS
+    opts = build_arg_parser().parse_args(argv)
+    VALIDATE_ENCODERS = not opts.no_encoder_test
+    if opts.rescan:
+        rescan_hardware()
+    base = settings_from_args(opts)
+
+    journal = Journal()
+    jobs = journal.take_pending() if opts.resume else []
+    if jobs:
+        print(f"Setze {len(jobs)} unterbrochene Jobs fort.", file=sys.stderr)
+    jobs += [{"input": f, "settings": base} for f in opts.files]
+    if opts.manifest:
+        try:
+            for row in load_manifest(opts.manifest):
+                jobs.append({"input": row["input"], "output": row.get("output"), "settings": manifest_settings(row, base)})
+        except (OSError, ValueError) as exc:
+            print(f"Manifest {opts.manifest}: {exc}", file=sys.stderr)
+            return 2
+    if not jobs:
+        print("Keine Eingabedateien angegeben.", file=sys.stderr)
+        return 2
+
+    def total_progress(val):
+        print(f"\rGesamt: {val * 100:5.1f} %", end="", file=sys.stderr, flush=True)
+
+    runner = BatchRunner(
+        jobs, workers=job_count(base, opts.jobs),
+        on_log=lambda text: print(text, file=sys.stderr) if text.startswith(("\nSTART", "FEHLER")) else None,
+        on_total_progress=total_progress,
+        journal=journal,
+        pin_cpus=opts.pin_cpus,
+        background=opts.background,
+        load_threshold=opts.load_threshold / 100,
+        prefetch_at=opts.prefetch_at / 100,
+        prefetch_bytes=opts.prefetch_mb << 20,
+        scratch_dir=opts.scratch_dir,
+    )
+    try:
+        failed = runner.run()
+    except KeyboardInterrupt:
+        runner.cancel()
+        return 130
+    print(f"\nFERTIG: {len(jobs) - len(failed)}/{len(jobs)} erfolgreich.", file=sys.stderr)
+    if runner.summary():
+        print(runner.summary(), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# =======================================================================
+# Titel:     GuideOS Videokonverter – Auftrags-Journal (ohne Qt)
+# =======================================================================
+import os
+import json
+import fcntl
+import time
+import uuid
+import socket
+import hashlib
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+STATE_DIR = Path.home() / ".local" / "state" / "guideos-videokonverter"
+JOURNAL_FILE = STATE_DIR / "journal.jsonl"
+
+# Zustände, in denen ein Job nach einem Absturz noch einmal laufen muss
+UNFINISHED = ("queued", "running")
+
+
+def settings_hash(settings):
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+
+def process_start(pid):
+    """Startzeitpunkt (Ticks seit Systemstart) eines Prozesses oder None; unterscheidet wiederverwendete PIDs."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii", errors="replace") as fh:
+            # Der Programmname in Klammern kann Leerzeichen enthalten
+            return int(fh.read().rpartition(")")[2].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _owner():
+    return {"pid": os.getpid(), "pid_start": process_start(os.getpid()), "host": socket.gethostname()}
+
+def owner_alive(record):
+    """Läuft der Prozess, der den Stapel angelegt hat, noch (bzw. gehört er zu einem anderen Rechner)?"""
+    if "pid" not in record:
+        return False
+    if record.get("host") != socket.gethostname():
+        # Geteiltes Home-Verzeichnis: fremde Stapel nie anfassen
+        return True
+    started = process_start(record["pid"])
+    return started is not None and started == record.get("pid_start")
+
+
+class Journal:
+    """Append-only JSON-Lines-Journal der Stapelaufträge.
+
+    Jede Zustandsänderung wird sofort angehängt und auf die Platte gebracht; nach einem
+    Absturz liefert `pending()` die Jobs, die weder fertig noch fehlgeschlagen sind.
+    Sauber beendete Stapel werden wieder aus der Datei entfernt.
+    """
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = Path(path)
+        # Eigene Sperrdatei, weil _drop das Journal per os.replace austauscht
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """Sperrt das Journal gegen andere Threads und (per flock) gegen andere Programminstanzen."""
+        with self._lock:
+            fd = None
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except OSError:
+                # Ohne Sperrdatei bleibt wenigstens die Sperre innerhalb des Prozesses
+                pass
+            try:
+                yield
+            finally:
+                if fd is not None:
+                    os.close(fd)
+
+    def _append(self, record):
+        record["time"] = time.time()
+        with self._locked():
+            try:
+                with open(self.path, "a+b") as fh:
+                    # Unvollständige letzte Zeile (Absturz beim Schreiben) abschließen
+                    if fh.tell() and (fh.seek(-1, os.SEEK_END), fh.read(1))[1] != b"\n":
+                        fh.write(b"\n")
+                    fh.write(json.dumps(record).encode() + b"\n")
+                    fh.flush()
+                    os.fsync(fh.fileno())
+            except OSError:
+                pass
+
+    def _records(self):
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # Bei einem Absturz mitten im Schreiben ist die letzte Zeile unvollständig
+                continue
+        return records
+
+    def start_batch(self, jobs):
+        """Trägt alle Jobs als "queued" ein und liefert die Stapel-ID."""
+        batch = uuid.uuid4().hex
+        owner = _owner()
+        for idx, job in enumerate(jobs):
+            self._append({
+                **owner, "batch": batch, "idx": idx, "state": "queued",
+                "input": str(job["input"]), "output": job.get("output"),
+                "settings": job["settings"], "settings_hash": settings_hash(job["settings"]),
+            })
+        return batch
+
+    def update(self, batch, idx, state, **fields):
+        self._append({"batch": batch, "idx": idx, "state": state, **fields})
+
+    def finish_batch(self, batch):
+        self._drop({batch})
+
+    def _drop(self, batches):
+        with self._locked():
+            self._rewrite(batches)
+
+    def _rewrite(self, batches):
+        """Schreibt das Journal ohne die Stapel `batches` neu; nur unter `_locked()` aufrufen."""
+        keep = [r for r in self._records() if r.get("batch") not in batches]
+        try:
+            if keep:
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text("".join(json.dumps(r) + "\n" for r in keep), encoding="utf-8")
+                os.replace(tmp, self.path)
+            else:
+                self.path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def pending(self):
+        """Unterbrochene Jobs als Job-Dicts (input, output, settings) in ursprünglicher Reihenfolge.
+
+        Stapel, deren Prozess noch läuft (z. B. eine zweite Programminstanz), zählen nicht dazu.
+        """
+        jobs = {}
+        for r in self._records():
+            key = (r.get("batch"), r.get("idx"))
+            job = jobs.setdefault(key, {"batch": r.get("batch")})
+            for field in ("state", "input", "output", "settings", "pid", "pid_start", "host"):
+                if r.get(field) is not None:
+                    job[field] = r[field]
+        return [
+            {"input": j["input"], "output": j.get("output"), "settings": j["settings"], "batch": j["batch"]}
+            for j in jobs.values()
+            if j.get("state") in UNFINISHED and "input" in j and "settings" in j and not owner_alive(j)
+        ]
+
+    def take_pending(self):
+        """Wie `pending()`, entfernt die betroffenen Stapel aber aus dem Journal (sie laufen neu eingetragen weiter)."""
+        # Lesen und Entfernen unter einer Sperre, damit keine zweite Instanz dieselben Jobs übernimmt
+        with self._locked():
+            jobs = self.pending()
+            self._rewrite({j.pop("batch") for j in jobs})
+        return jobs
+
+    def discard_pending(self):
+        with self._locked():
+            self._rewrite({j["batch"] for j in self.pending()})
@@ -6,22 +6,68 @@ import sys
 import os
 import subprocess
 import threading
+from collections import OrderedDict
+
+import video_probe
 
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QPushButton,
     QDialogButtonBox, QScrollArea, QRadioButton, QButtonGroup,
-    QApplication, QMainWindow
+    QApplication, QMainWindow, QCheckBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QObject
-from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtGui import QImage, QPixmap, QPainter
 
 
 class ThreadSignals(QObject):
     pixmap_ready = pyqtSignal(QPixmap)
+    sprite_ready = pyqtSignal(str)
+
+
+class FrameCache:
+    """LRU-Cache für Vorschaubilder (JPEG-Bytes) mit fester Speichergrenze.
+
+    Schlüssel ist (Zeit-Bucket, Zielhöhe). Fehlt eine Höhe, kann ein Bild derselben
+    Position in höherer Auflösung herunterskaliert werden.
+    """
+    def __init__(self, max_mb=64):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.size = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, bucket, height):
+        """Liefert (jpeg_bytes, gespeicherte_höhe) oder None."""
+        with self._lock:
+            key = (bucket, height)
+            if key not in self._frames:
+                larger = sorted(h for (b, h) in self._frames if b == bucket and h > height)
+                if not larger:
+                    return None
+                key = (bucket, larger[0])
+            self._frames.move_to_end(key)
+            return self._frames[key], key[1]
+
+    def put(self, bucket, height, data):
+        with self._lock:
+            old = self._frames.pop((bucket, height), None)
+            if old is not None:
+                self.size -= len(old)
+            self._frames[(bucket, height)] = data
+            self.size += len(data)
+            while self.size > self.max_bytes and len(self._frames) > 1:
+                _, dropped = self._frames.popitem(last=False)
+                self.size -= len(dropped)
 
 
 class VideoPreviewDialog(QDialog):
-    def __init__(self, parent=None, video_path=""):
+    # Positionen innerhalb eines Buckets teilen sich ein Vorschaubild
+    BUCKET_SECONDS = 0.1
+    # Filmstreifen: Anzahl Kacheln und Spalten des Kachelbilds
+    SPRITE_COUNT = 100
+    SPRITE_COLUMNS = 10
+
+    def __init__(self, parent=None, video_path="", cache_mb=64):
         super().__init__(parent)
         self.setWindowTitle("Schnittbereich wählen")
         self.setModal(True)
@@ -30,11 +76,32 @@ class VideoPreviewDialog(QDialog):
         self.duration = self.get_duration()
         self.start_time = 0.0
         self.end_time = self.duration
-        self.is_updating = False
+        self.frame_cache = FrameCache(cache_mb)
 
         # Threading Signal verbinden
         self.signals = ThreadSignals()
         self.signals.pixmap_ready.connect(self._set_image)
+        self.signals.sprite_ready.connect(self._on_sprite_ready)
+
+        # Ein langlebiger Vorschau-Worker mit einem Briefkasten-Platz:
+        # nur die zuletzt angeforderte Position wird dekodiert.
+        self._request = None
+        self._request_cond = threading.Condition()
+        self._decoding = None
+        self._wanted = None
+        self._wanted_shown = False
+        self._closing = False
+        threading.Thread(target=self._preview_worker, daemon=True).start()
+
+        # Filmstreifen im Hintergrund in einem einzigen Dekodierdurchlauf erzeugen
+        self.sprite = None
+        self._sprite_proc = None
+        threading.Thread(target=self._build_sprite, daemon=True).start()
+
+        # Keyframe-Index für Einrasten und schnelles Keyframe-Spulen
+        self.keyframes = None
+        self._keyframe_proc = None
+        threading.Thread(target=self._build_keyframes, daemon=True).start()
 
         # 1. Das exakte Seitenverhältnis (Aspect Ratio) des Videos ermitteln
         self.video_aspect_ratio = self.get_video_aspect_ratio()
@@ -102,8 +169,15 @@ class VideoPreviewDialog(QDialog):
         self.slider.setRange(0, int(self.duration * 1000))
         self.slider.setValue(0)
         self.slider.valueChanged.connect(self.on_slider_moved)
+        self.slider.sliderReleased.connect(self.trigger_preview_update)
         vbox.addWidget(self.slider)
 
+        # Filmstreifen unter dem Slider (erscheint, sobald das Kachelbild fertig ist)
+        self.filmstrip = QLabel(self)
+        self.filmstrip.setFixedHeight(48)
+        self.filmstrip.setVisible(False)
+        vbox.addWidget(self.filmstrip)
+
         # 5. Buttons In/Out
         hbox = QHBoxLayout()
         hbox.setSpacing(10)
@@ -116,6 +190,10 @@ class VideoPreviewDialog(QDialog):
         self.btn_out.clicked.connect(self.set_out_point)
         hbox.addWidget(self.btn_out, stretch=1)
 
+        self.snap_chk = QCheckBox("An Keyframes ausrichten", self)
+        self.snap_chk.setToolTip("Setzt In/Out auf den nächstgelegenen Keyframe.\nSchnitte an Keyframes lassen sich ohne Neukodierung kopieren.")
+        hbox.addWidget(self.snap_chk)
+
         vbox.addLayout(hbox)
 
         # 6. Status-Label
@@ -135,21 +213,8 @@ class VideoPreviewDialog(QDialog):
 
     def get_video_aspect_ratio(self):
         """Ermittelt die echten Pixel-Dimensionen und errechnet das Seitenverhältnis (W/H)."""
-        cmd = [
-            "ffprobe", "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height",
-            "-of", "csv=p=0:s=x",
-            self.video_path
-        ]
-        try:
-            output = subprocess.check_output(cmd).decode().strip()
-            dimensions = output.split('\n')[0]
-            width, height = map(int, dimensions.split('x'))
-            return width / height
-        except Exception as e:
-            print(f"Fehler bei der Seitenverhältnis-Ermittlung: {e}")
-            return 16.0 / 9.0  # Fallback auf Standard-Querformat
+        # Fallback auf Standard-Querformat, falls ffprobe nichts liefert
+        return video_probe.aspect_ratio(self.video_path, fallback=16.0 / 9.0)
 
     def update_window_dimensions(self):
         """Berechnet die optimalen Maße für das Widget und passt das Fenster an."""
@@ -178,20 +243,118 @@ class VideoPreviewDialog(QDialog):
             self.trigger_preview_update()
 
     def trigger_preview_update(self):
-        seconds = self.slider.value() / 1000.0
-        if not self.is_updating:
-            threading.Thread(target=self.update_preview, args=(seconds,), daemon=True).start()
+        bucket = round(self.slider.value() / 1000.0 / self.BUCKET_SECONDS)
+        height = self.current_target_height
+        # Grobes Spulen per Filmstreifen ohne Dekodierung, exakt erst beim Loslassen
+        dragging = self.slider.isSliderDown()
+        hit = self.show_cached_frame(bucket) or (dragging and self.show_sprite_frame())
+        # Ohne Filmstreifen beim Ziehen nur den vorherigen Keyframe dekodieren (kein Vorwärts-Dekodieren)
+        keyframe = None
+        if dragging and not hit and self.keyframes:
+            keyframe = video_probe.keyframe_before(self.keyframes, self.slider.value() / 1000.0)
+        with self._request_cond:
+            self._wanted, self._wanted_shown = (bucket, height, keyframe), hit
+            self._request = None if hit else self._wanted
+            # Beim Ziehen laufende Dekodierung zu Ende führen, damit Zwischenbilder erscheinen;
+            # bei Sprüngen und beim Loslassen wird eine überholte Dekodierung abgebrochen.
+            if not self.slider.isSliderDown():
+                self._kill_superseded()
+            self._request_cond.notify()
+
+    def _build_sprite(self):
+        def register(proc):
+            self._sprite_proc = proc
+        path = video_probe.sprite_sheet(
+            self.video_path, self.SPRITE_COUNT, columns=self.SPRITE_COLUMNS, register=register
+        )
+        if path and not self._closing:
+            self.signals.sprite_ready.emit(str(path))
+
+    def _build_keyframes(self):
+        def register(proc):
+            self._keyframe_proc = proc
+        self.keyframes = video_probe.keyframes(self.video_path, register=register)
+
+    def _on_sprite_ready(self, path):
+        img = QImage(path)
+        if img.isNull():
+            return
+        self.sprite = img
+        self.filmstrip.setVisible(True)
+        self._render_filmstrip()
+
+    def _sprite_tile(self, index):
+        rows = -(-self.SPRITE_COUNT // self.SPRITE_COLUMNS)
+        w = self.sprite.width() // self.SPRITE_COLUMNS
+        h = self.sprite.height() // rows
+        return self.sprite.copy((index % self.SPRITE_COLUMNS) * w, (index // self.SPRITE_COLUMNS) * h, w, h)
+
+    def _render_filmstrip(self):
+        """Verteilt so viele Kacheln gleichmäßig über die Slider-Breite, wie nebeneinander passen."""
+        width, height = max(1, self.slider.width()), self.filmstrip.height()
+        tile_w = max(1, int(height * self.video_aspect_ratio))
+        count = max(1, min(self.SPRITE_COUNT, width // tile_w))
+        strip = QPixmap(width, height)
+        strip.fill(Qt.GlobalColor.black)
+        painter = QPainter(strip)
+        for i in range(count):
+            tile = self._sprite_tile(i * self.SPRITE_COUNT // count)
+            painter.drawImage(i * width // count, 0, tile.scaled(
+                width // count, height, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+            ))
+        painter.end()
+        self.filmstrip.setPixmap(strip)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.sprite is not None:
+            self._render_filmstrip()
+
+    def show_sprite_frame(self):
+        """Zeigt die zur Slider-Position passende Filmstreifen-Kachel an."""
+        if self.sprite is None or self.duration <= 0:
+            return False
+        index = min(self.SPRITE_COUNT - 1, int(self.slider.value() / 1000.0 / self.duration * self.SPRITE_COUNT))
+        tile = self._sprite_tile(index).scaledToHeight(self.current_target_height, Qt.TransformationMode.SmoothTransformation)
+        self._set_image(QPixmap.fromImage(tile))
+        return True
+
+    def _kill_superseded(self):
+        if self._decoding and self._decoding[0] != self._wanted:
+            try:
+                self._decoding[1].kill()
+            except OSError:
+                pass
+
+    def _preview_worker(self):
+        while True:
+            with self._request_cond:
+                while self._request is None and not self._closing:
+                    self._request_cond.wait()
+                if self._closing:
+                    return
+                bucket, height, keyframe = self._request
+                self._request = None
+            self.update_preview(bucket, height, keyframe)
+
+    def show_cached_frame(self, bucket):
+        """Zeigt ein bereits dekodiertes Bild sofort an (ggf. aus höherer Auflösung verkleinert)."""
+        hit = self.frame_cache.get(bucket, self.current_target_height)
+        if not hit:
+            return False
+        data, height = hit
+        img = QImage.fromData(data)
+        if height != self.current_target_height:
+            img = img.scaledToHeight(self.current_target_height, Qt.TransformationMode.SmoothTransformation)
+        self._set_image(QPixmap.fromImage(img))
+        return True
 
     def get_duration(self):
-        cmd = [
-            "ffprobe", "-v", "error", "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1", self.video_path
-        ]
-        try:
-            return float(subprocess.check_output(cmd).decode().strip())
-        except Exception as e:
-            print(f"Fehler beim Ermitteln der Dauer: {e}")
+        dur = video_probe.duration(self.video_path)
+        if dur is None:
+            print("Fehler beim Ermitteln der Dauer")
             return 0.0
+        return dur
 
     def format_time(self, seconds):
         h = int(seconds // 3600)
@@ -204,39 +367,69 @@ class VideoPreviewDialog(QDialog):
         self.time_label.setText(f"<b>Position: {self.format_time(seconds)}</b>")
         self.trigger_preview_update()
 
-    def update_preview(self, seconds):
-        self.is_updating = True
-
-        video_filter = f"scale=-1:{self.current_target_height}"
+    def update_preview(self, bucket, height, keyframe=None):
+        seconds = bucket * self.BUCKET_SECONDS
+        video_filter = f"scale=-1:{height}"
 
         cmd = [
             "ffmpeg", "-ss", str(seconds), "-i", self.video_path, "-frames:v", "1",
             "-vf", video_filter, "-f", "image2pipe", "-vcodec", "mjpeg", "-"
         ]
+        if keyframe is not None:
+            cmd[1:3] = ["-skip_frame", "nokey", "-ss", str(keyframe)]
 
         try:
-            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            with self._request_cond:
+                if self._closing:
+                    return
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                self._decoding = ((bucket, height, keyframe), proc)
             output, _ = proc.communicate()
-            if output:
-                img = QImage.fromData(output)
-                pix = QPixmap.fromImage(img)
-                self.signals.pixmap_ready.emit(pix)
+            if output and proc.returncode == 0:
+                # Keyframe-Bilder gehören nicht exakt zum Bucket und werden nicht gecacht
+                if keyframe is None:
+                    self.frame_cache.put(bucket, height, output)
+                # Bereits aus dem Cache bediente Position nicht mit einem älteren Bild überschreiben
+                if not self._wanted_shown:
+                    img = QImage.fromData(output)
+                    pix = QPixmap.fromImage(img)
+                    self.signals.pixmap_ready.emit(pix)
         except Exception as e:
             print(f"Preview Error: {e}")
         finally:
-            self.is_updating = False
+            with self._request_cond:
+                self._decoding = None
+
+    def done(self, result):
+        """Beendet beim Schließen den Vorschau-Worker samt laufender Dekodierung."""
+        with self._request_cond:
+            self._closing = True
+            self._wanted = None
+            self._kill_superseded()
+            self._request_cond.notify()
+        for proc in (self._sprite_proc, self._keyframe_proc):
+            if proc and proc.poll() is None:
+                proc.kill()
+        super().done(result)
 
     def _set_image(self, pixmap):
         self.image.setPixmap(pixmap)
 
+    def _snapped_position(self):
+        seconds = self.slider.value() / 1000.0
+        if self.snap_chk.isChecked() and self.keyframes:
+            seconds = video_probe.nearest_keyframe(self.keyframes, seconds)
+            self.slider.setValue(int(seconds * 1000))
+        return seconds
+
     def set_in_point(self):
-        self.start_time = self.slider.value() / 1000.0
+        self.start_time = self._snapped_position()
         if self.start_time > self.end_time:
             self.end_time = self.duration
         self.update_status()
 
     def set_out_point(self):
-        self.end_time = self.slider.value() / 1000.0
+        self.end_time = self._snapped_position()
         if self.end_time < self.start_time:
             self.start_time = 0.0
         self.update_status()
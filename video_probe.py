@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# =======================================================================
+# Titel:     GuideOS Videokonverter – ffprobe-Metadaten-Cache (ohne Qt)
+# =======================================================================
+import os
+import json
+import math
+import time
+import shutil
+import hashlib
+import subprocess
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".cache" / "guideos-videokonverter"
+MEMORY_ENTRIES = 256
+# Aufbewahrung: so lange nicht genutzte Einträge fallen weg, darüber hinaus die ältesten ab dieser Größe
+CACHE_KEEP_DAYS = 60
+CACHE_MAX_BYTES = 512 << 20
+
+_memory = OrderedDict()
+_keyframe_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+def _file_key(path):
+    """(Pfad, Größe, mtime) – ändert sich die Datei, ändert sich auch der Schlüssel."""
+    p = Path(path).resolve()
+    st = p.stat()
+    return (str(p), st.st_size, st.st_mtime_ns)
+
+def fingerprint(path, block=1 << 20):
+    """Schneller Inhalts-Fingerabdruck: Größe, mtime und SHA-1 über Anfangs- und Endblock (ohne Pfad)."""
+    try:
+        p = Path(path)
+        st = p.stat()
+        h = hashlib.sha1()
+        with open(p, "rb") as fh:
+            h.update(fh.read(block))
+            if st.st_size > block:
+                fh.seek(max(block, st.st_size - block))
+                h.update(fh.read(block))
+    except OSError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}:{h.hexdigest()}"
+
+def cache_path(path, kind, suffix=".json", extra=""):
+    """Pfad einer Cache-Datei für `path`; Größe und mtime stecken im Namen, alte Stände werden so nie gelesen."""
+    name = hashlib.sha1("|".join(map(str, _file_key(path) + (extra,))).encode()).hexdigest()
+    return CACHE_DIR / kind / f"{name}{suffix}"
+
+def touch(target):
+    """Markiert eine Cache-Datei als genutzt; höchstens einmal am Tag, um Schreibzugriffe zu sparen."""
+    try:
+        if time.time() - target.stat().st_mtime > 86400:
+            os.utime(target)
+    except OSError:
+        pass
+
+def _remove(p):
+    if p.is_dir():
+        shutil.rmtree(p, ignore_errors=True)
+    else:
+        p.unlink(missing_ok=True)
+
+def prune_cache(keep_days=CACHE_KEEP_DAYS, max_bytes=CACHE_MAX_BYTES):
+    """Löscht lange nicht genutzte Cache-Einträge und danach die ältesten über `max_bytes`.
+
+    Wird zu Beginn jedes Stapels aufgerufen. Im Zwischenordner "scratch" zählt nur das Alter,
+    dort liegen auch Ausgaben, die gerade entstehen.
+    """
+    try:
+        kinds = [d for d in CACHE_DIR.iterdir() if d.is_dir()]
+    except OSError:
+        return
+    cutoff = time.time() - keep_days * 86400
+    entries = []
+    for kind in kinds:
+        try:
+            files = list(kind.iterdir())
+        except OSError:
+            continue
+        for p in files:
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            if st.st_mtime < cutoff:
+                _remove(p)
+            elif kind.name != "scratch":
+                entries.append((st.st_mtime, st.st_size, p))
+    total = sum(size for _, size, _ in entries)
+    for _, size, p in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(p)
+        total -= size
+
+def load_json(path, kind, extra=""):
+    try:
+        target = cache_path(path, kind, extra=extra)
+        data = json.loads(target.read_text())
+    except (OSError, ValueError):
+        return None
+    touch(target)
+    return data
+
+def store_json(path, kind, data, extra=""):
+    try:
+        target = cache_path(path, kind, extra=extra)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, target)
+    except OSError:
+        pass
+
+
+def probe(path):
+    """Liefert die komplette ffprobe-Ausgabe (format + streams) – ein Aufruf pro Datei und Dateistand."""
+    try:
+        key = _file_key(path)
+    except OSError:
+        return None
+
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+
+    data = load_json(path, "probe")
+    if data is None:
+        if not shutil.which("ffprobe"):
+            return None
+        try:
+            out = subprocess.check_output([
+                "ffprobe", "-v", "error", "-show_format", "-show_streams",
+                "-of", "json", key[0]
+            ], stderr=subprocess.DEVNULL)
+            data = json.loads(out)
+        except (subprocess.SubprocessError, OSError, ValueError):
+            return None
+        store_json(path, "probe", data)
+
+    with _lock:
+        _memory[key] = data
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+    return data
+
+def duration(path):
+    data = probe(path)
+    if not data: return None
+    try:
+        return float(data["format"]["duration"])
+    except (KeyError, ValueError):
+        durs = [float(s["duration"]) for s in data.get("streams", []) if s.get("duration")]
+        return max(durs) if durs else None
+
+def video_stream(path):
+    data = probe(path) or {}
+    return next((s for s in data.get("streams", []) if s.get("codec_type") == "video"), None)
+
+def rotation(path):
+    """Drehung des ersten Videostreams laut Metadaten in Grad (0, 90, 180, 270), wie im rotate-Tag."""
+    stream = video_stream(path) or {}
+    try:
+        if "rotate" in stream.get("tags", {}):
+            return int(stream["tags"]["rotate"]) % 360
+        for side in stream.get("side_data_list", []):
+            if "rotation" in side:
+                # Die Display-Matrix zählt gegen den Uhrzeigersinn
+                return round(-float(side["rotation"])) % 360
+    except (TypeError, ValueError):
+        pass
+    return 0
+
+def has_audio(path):
+    data = probe(path) or {}
+    return any(s.get("codec_type") == "audio" for s in data.get("streams", []))
+
+def aspect_ratio(path, fallback=16.0 / 9.0):
+    """Seitenverhältnis (W/H) des ersten Videostreams."""
+    stream = video_stream(path)
+    try:
+        return int(stream["width"]) / int(stream["height"])
+    except (TypeError, KeyError, ValueError, ZeroDivisionError):
+        return fallback
+
+
+def sprite_sheet(path, count=100, height=144, columns=10, register=None):
+    """Erzeugt in einem ffmpeg-Durchlauf ein Kachelbild aus `count` gleichmäßig verteilten Vorschaubildern.
+
+    Das Ergebnis liegt neben den Probe-Daten im Cache; `register` erhält den laufenden Prozess (zum Abbrechen).
+    """
+    dur = duration(path)
+    if not dur or not shutil.which("ffmpeg"):
+        return None
+    target = cache_path(path, "sprites", ".jpg", extra=f"{count}x{height}x{columns}")
+    if target.exists():
+        touch(target)
+        return target
+
+    rows = -(-count // columns)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".tmp.jpg")
+    # Nur Keyframes dekodieren: für Vorschaubilder genügt das und erspart bei langen
+    # Aufnahmen einen Dekodierdurchlauf über die ganze Datei; fps füllt die Lücken auf
+    cmd = [
+        "ffmpeg", "-v", "error", "-skip_frame", "nokey", "-i", str(Path(path).resolve()), "-an", "-sn",
+        "-vf", f"fps={count}/{dur:.3f},scale=-2:{height},tile={columns}x{rows}",
+        "-frames:v", "1", "-q:v", "4", "-y", str(tmp)
+    ]
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if register:
+            register(proc)
+        if proc.wait() != 0 or not tmp.exists():
+            return None
+        os.replace(tmp, target)
+        return target
+    except OSError:
+        return None
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def loudness(path, start=0.0, dur=0.0, register=None, measure=True):
+    """EBU-R128-Messwerte (I, TP, LRA, thresh) der ersten Tonspur im Bereich start..start+dur (dur 0 = bis Ende).
+
+    Misst einmal per `loudnorm=print_format=json` und legt das Ergebnis je Datei und Bereich im Cache ab;
+    auch „nicht messbar“ (Stille) wird gemerkt. Mit `measure=False` wird nur der Cache gelesen.
+    """
+    extra = f"{start:.3f}:{dur:.3f}"
+    data = load_json(path, "loudness", extra=extra)
+    if data is not None:
+        # Leerer Eintrag: bereits gemessen, aber nicht verwendbar
+        return data or None
+    if not measure or not has_audio(path) or not shutil.which("ffmpeg"):
+        return None
+
+    cmd = ["ffmpeg", "-hide_banner", "-nostats"]
+    if start > 0:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", str(Path(path).resolve())]
+    if dur > 0:
+        cmd += ["-t", f"{dur:.3f}"]
+    cmd += ["-map", "0:a:0", "-af", "loudnorm=print_format=json", "-f", "null", "-"]
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if register:
+            register(proc)
+        _, err = proc.communicate()
+        if proc.returncode != 0:
+            return None
+        # Der JSON-Block steht am Ende der Ausgabe
+        stats = json.loads(err[err.rindex("{"):err.rindex("}") + 1])
+        data = {
+            "I": float(stats["input_i"]),
+            "TP": float(stats["input_tp"]),
+            "LRA": float(stats["input_lra"]),
+            "thresh": float(stats["input_thresh"]),
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+    # Stille liefert -inf; damit ist keine lineare Normalisierung möglich
+    if not all(math.isfinite(v) for v in data.values()):
+        store_json(path, "loudness", {}, extra=extra)
+        return None
+    store_json(path, "loudness", data, extra=extra)
+    return data
+
+
+def keyframes(path, register=None):
+    """Zeitstempel (s) aller Keyframes des ersten Videostreams als sortiertes array('d').
+
+    Die Zeiten sind relativ zu `format.start_time` – so, wie ffmpeg `-ss` auf der Eingabe auslegt
+    (MPEG-TS und MP4 mit Edit-Liste beginnen nicht bei 0). Ermittelt per `ffprobe -show_packets`
+    (ohne Dekodierung) und binär im Cache abgelegt.
+    """
+    try:
+        key = _file_key(path)
+    except OSError:
+        return None
+    with _lock:
+        if key in _keyframe_memory:
+            _keyframe_memory.move_to_end(key)
+            return _keyframe_memory[key]
+
+    times = array("d")
+    target = cache_path(path, "keyframes", ".bin", extra="relativ")
+    try:
+        times.frombytes(target.read_bytes())
+        touch(target)
+    except OSError:
+        if not shutil.which("ffprobe"):
+            return None
+        cmd = [
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", key[0]
+        ]
+        try:
+            offset = float(((probe(path) or {}).get("format") or {}).get("start_time") or 0.0)
+        except ValueError:
+            offset = 0.0
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            if register:
+                register(proc)
+            for line in proc.stdout:
+                pts, _, flags = line.strip().partition(",")
+                if "K" in flags and pts not in ("", "N/A"):
+                    times.append(max(0.0, float(pts) - offset))
+            if proc.wait() != 0:
+                return None
+        except (OSError, ValueError):
+            return None
+        times = array("d", sorted(times))
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(".tmp")
+            tmp.write_bytes(times.tobytes())
+            os.replace(tmp, target)
+        except OSError:
+            pass
+
+    with _lock:
+        _keyframe_memory[key] = times
+        while len(_keyframe_memory) > MEMORY_ENTRIES:
+            _keyframe_memory.popitem(last=False)
+    return times
+
+def keyframe_before(times, t):
+    """Letzter Keyframe <= t (bzw. der erste, falls t davor liegt)."""
+    i = bisect_right(times, t)
+    return times[max(0, i - 1)] if times else t
+
+def keyframe_after(times, t):
+    """Erster Keyframe >= t, oder None, wenn danach keiner mehr kommt."""
+    i = bisect_left(times, t)
+    return times[i] if i < len(times) else None
+
+def nearest_keyframe(times, t):
+    if not times:
+        return t
+    i = bisect_left(times, t)
+    candidates = times[max(0, i - 1):i + 1]
+    return min(candidates, key=lambda k: abs(k - t))